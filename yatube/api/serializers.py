@@ -0,0 +1,100 @@
+"""Строки API прямо из values(): без создания экземпляров моделей.
+
+Поле API отображается на выражение ORM. Выбираются только поля,
+запрошенные через ?fields=, поэтому, например, без author нет и JOIN
+с auth_user. Ключ курсора (дата, id) выбирается всегда.
+"""
+import json
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+
+from posts.utils import CursorPaginator
+
+try:
+    import orjson
+except ImportError:
+    # orjson необязателен: без него ответы кодирует стандартный json.
+    orjson = None
+
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'comments_count': 'comments_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+# Даты — строкой заранее: orjson и DjangoJSONEncoder пишут их
+# по-разному (микросекунды и +00:00 против миллисекунд и Z).
+CONVERTERS = {
+    'image': lambda name: default_storage.url(name) if name else None,
+    'pub_date': lambda value: value.isoformat(),
+    'created': lambda value: value.isoformat(),
+}
+
+
+class FieldsError(ValueError):
+    """В ?fields= есть поле, которого нет в API."""
+
+
+def requested_fields(request, fields):
+    """Имена полей из ?fields=a,b; без параметра — все поля."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(fields)
+    names = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in names if name not in fields]
+    if unknown or not names:
+        raise FieldsError(
+            'Неизвестные поля: ' + ', '.join(unknown) if unknown
+            else 'Пустой список полей')
+    return names
+
+
+class ValuesCursorPaginator(CursorPaginator):
+    """CursorPaginator для строк-словарей из values()."""
+
+    def key(self, obj):
+        return obj[self.date_field], obj[self.id_field]
+
+
+def page(queryset, fields, names, per_page, after=None, before=None,
+         date_field='pub_date'):
+    """Страница строк по курсору: results и курсоры соседних страниц."""
+    lookups = {fields[name] for name in names} | {date_field, 'id'}
+    pages = ValuesCursorPaginator(
+        queryset.values(*lookups), per_page, date_field=date_field)
+    page_obj = pages.cursor_page(after=after, before=before)
+    return {
+        'results': [row(values, fields, names) for values in page_obj],
+        'next': pages.next_cursor,
+        'previous': pages.previous_cursor,
+    }
+
+
+def row(values, fields, names):
+    result = {}
+    for name in names:
+        value = values[fields[name]]
+        if name in CONVERTERS:
+            value = CONVERTERS[name](value)
+        result[name] = value
+    return result
+
+
+def dumps(data):
+    """JSON в байтах: orjson, если установлен, иначе json."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(
+        data, cls=DjangoJSONEncoder, ensure_ascii=False,
+        separators=(',', ':')).encode()
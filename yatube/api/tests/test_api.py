@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow
+from posts.tests.shortcuts import group_create, post_create
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', first_name='Имя', last_name='Фамилия')
+        cls.group = group_create('Группа', 'Описание')
+        cls.posts = [
+            post_create(f'Пост {i}', cls.author, cls.group)
+            for i in range(13)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.author, text='Комментарий')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_posts_cursor_pagination(self):
+        """Лента листается курсором без повторов и пропусков"""
+        url = reverse('api:posts')
+        first = self.client.get(url).json()
+        self.assertEqual(len(first['results']), 10)
+        self.assertIsNone(first['previous'])
+        second = self.client.get(url, {'after': first['next']}).json()
+        self.assertEqual(len(second['results']), 3)
+        self.assertIsNone(second['next'])
+        ids = [post['id'] for post in first['results'] + second['results']]
+        self.assertEqual(
+            ids, sorted((post.pk for post in self.posts), reverse=True))
+        self.assertEqual(first['results'][0]['author'], 'author')
+        self.assertEqual(first['results'][0]['group'], 'slug')
+
+    def test_sparse_fields_skip_joins(self):
+        """?fields= выбирает только нужные колонки"""
+        with self.assertNumQueries(1) as context:
+            response = self.client.get(
+                reverse('api:posts'), {'fields': 'id,text'})
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'text'})
+        self.assertNotIn('JOIN', context.captured_queries[0]['sql'])
+
+    def test_unknown_field_is_400(self):
+        response = self.client.get(reverse('api:posts'), {'fields': 'pk'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('pk', response.json()['detail'])
+
+    def test_group_profile_and_comments(self):
+        """Посты группы, профиль и комментарии"""
+        group = self.client.get(
+            reverse('api:group_posts', kwargs={'slug': 'slug'})).json()
+        self.assertEqual(group['group']['title'], 'Группа')
+        self.assertEqual(len(group['results']), 10)
+        profile = self.client.get(
+            reverse('api:profile', kwargs={'username': 'author'})).json()
+        self.assertEqual(profile['posts_count'], 13)
+        self.assertEqual(profile['first_name'], 'Имя')
+        comments = self.client.get(reverse(
+            'api:post_comments', kwargs={'post_id': self.posts[0].pk}
+        )).json()
+        self.assertEqual(comments['results'][0]['text'], 'Комментарий')
+
+    def test_missing_objects_are_json_404(self):
+        for url in (
+            reverse('api:group_posts', kwargs={'slug': 'missing'}),
+            reverse('api:profile', kwargs={'username': 'missing'}),
+            reverse('api:post_comments', kwargs={'post_id': 10 ** 6}),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_etag_not_modified_without_queries(self):
+        """Повторный условный запрос получает 304 без запросов к базе"""
+        url = reverse('api:posts')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        post_create('Новый пост', self.author, self.group)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['text'], 'Новый пост')
+
+    def test_follow_changes_follower_profile(self):
+        """Подписка меняет ETag профиля и автора, и подписчика"""
+        reader = User.objects.create_user(username='reader')
+        url = reverse('api:profile', kwargs={'username': 'reader'})
+        etag = self.client.get(url)['ETag']
+        Follow.objects.create(user=reader, author=self.author)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['following_count'], 1)
+
+    def test_dates_keep_microseconds_and_offset(self):
+        """Даты в ответе не зависят от того, установлен ли orjson"""
+        post = self.posts[-1]
+        data = self.client.get(reverse('api:posts')).json()
+        self.assertEqual(data['results'][0]['pub_date'],
+                         post.pub_date.isoformat())
+        with mock.patch('api.serializers.orjson', None):
+            cache.clear()
+            again = self.client.get(reverse('api:posts')).json()
+        self.assertEqual(again, data)
+
+    def test_read_only(self):
+        response = self.client.post(reverse('api:posts'))
+        self.assertEqual(response.status_code, 405)
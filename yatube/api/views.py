@@ -0,0 +1,120 @@
+"""JSON-API только для чтения: посты, группы, профили, комментарии.
+
+Представления не трогают сессию, пользователя и шаблоны. ETag и
+Last-Modified строятся по версиям областей кэша (см. posts.cache) до
+выборки данных, так что на повторный условный запрос 304 уходит без
+обращения к базе.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET
+
+from core.db.routers import use_replica
+from posts import authors
+from posts.cache import get_versions, settled, validators
+from posts.groups import registry
+from posts.models import Comment, Post
+
+from .serializers import (
+    COMMENT_FIELDS, POST_FIELDS, FieldsError, dumps, page, requested_fields)
+
+
+def json_response(data, status=200):
+    return HttpResponse(
+        dumps(data), status=status, content_type='application/json')
+
+
+def api_view(*scopes):
+    """Оборачивает представление, возвращающее данные для JSON.
+
+    scopes — шаблоны областей кэша, от которых зависит ответ, с
+    подстановкой аргументов из URL: 'group:{slug}'.
+    """
+    def decorator(view):
+        @use_replica
+        @require_GET
+        @wraps(view)
+        def wrapper(request, **kwargs):
+            versions = get_versions(
+                [scope.format(**kwargs) for scope in scopes])
+            etag, last_modified = validators(
+                'api:' + request.get_full_path(), versions)
+            # Свежая запись могла не дойти до реплики: такой ответ
+            # уходит без валидаторов, иначе клиент получал бы 304 на
+            # старые данные до следующей записи.
+            fresh = settled(versions)
+            response = None
+            if fresh:
+                response = get_conditional_response(
+                    request, etag=etag, last_modified=last_modified)
+            if response is None:
+                try:
+                    response = json_response(view(request, **kwargs))
+                except Http404 as error:
+                    return json_response({'detail': str(error)}, 404)
+                except FieldsError as error:
+                    return json_response({'detail': str(error)}, 400)
+            if fresh:
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, public=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def posts_page(request, queryset):
+    return page(
+        queryset, POST_FIELDS, requested_fields(request, POST_FIELDS),
+        settings.POSTS_MAX,
+        after=request.GET.get('after'), before=request.GET.get('before'))
+
+
+@api_view('posts')
+def posts(request):
+    return posts_page(request, Post.objects.all())
+
+
+@api_view('groups', 'group:{slug}')
+def group_posts(request, slug):
+    group = registry.get_by_slug(slug)
+    if group is None:
+        raise Http404('Нет такой группы')
+    data = {
+        'group': {
+            'slug': group.slug,
+            'title': group.title,
+            'description': group.description,
+        },
+    }
+    data.update(posts_page(request, Post.objects.filter(group_id=group.pk)))
+    return data
+
+
+@api_view('author:{username}')
+def profile(request, username):
+    card = authors.get_by_username(username)
+    if card is None:
+        raise Http404('Нет такого пользователя')
+    data = {
+        field: card[field] for field in (
+            'username', 'first_name', 'last_name',
+            'posts_count', 'followers_count', 'following_count')
+    }
+    data.update(posts_page(request, Post.objects.filter(author_id=card['id'])))
+    return data
+
+
+@api_view('post:{post_id}')
+def post_comments(request, post_id):
+    data = page(
+        Comment.objects.filter(post_id=post_id), COMMENT_FIELDS,
+        requested_fields(request, COMMENT_FIELDS), settings.COMMENTS_MAX,
+        after=request.GET.get('after'), date_field='created')
+    if not data['results'] and not Post.objects.filter(pk=post_id).exists():
+        raise Http404('Нет такого поста')
+    return data
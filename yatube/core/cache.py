@@ -0,0 +1,72 @@
+"""Чтение из кэша с защитой от «набега» (cache stampede).
+
+Когда запись в кэше устаревает, пересчитывать её должен один процесс,
+а не все воркеры разом. get_or_set берёт короткую блокировку через
+cache.add, остальные ждут готовое значение. Блокировка надёжна, только
+если add атомарен: так у кэша SQLite из core.cache_backends, у locmem,
+Redis и Memcached, но не у FileBasedCache. Кроме того, запись
+пересчитывается чуть раньше срока с вероятностью, растущей к концу
+её жизни (алгоритм XFetch), поэтому горячие ключи не истекают одновременно.
+"""
+import math
+import random
+import time
+
+from django.core.cache import cache
+
+from . import performance
+
+BETA = 1.0
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 0.5
+LOCK_POLL = 0.05
+
+
+def _recompute_early(delta, expiry):
+    return time.time() - delta * BETA * math.log(1 - random.random()) >= expiry
+
+
+def _compute_and_store(key, compute, timeout):
+    started = time.time()
+    value = compute()
+    if value is not None:
+        delta = time.time() - started
+        cache.set(key, (value, delta, time.time() + timeout), timeout)
+    return value
+
+
+def get_or_set(key, compute, timeout, is_fresh=None):
+    """Значение key из кэша либо результат compute().
+
+    is_fresh(value) позволяет отбросить запись раньше срока, например
+    по версиям данных. Если compute() вернул None, ничего не кэшируется.
+    """
+    lock_key = f'lock:{key}'
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expiry = entry
+        if is_fresh is None or is_fresh(value):
+            if not _recompute_early(delta, expiry):
+                performance.record_cache(hit=True)
+                return value
+            if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+                performance.record_cache(hit=True)
+                return value
+            performance.record_cache(hit=False)
+            try:
+                return _compute_and_store(key, compute, timeout)
+            finally:
+                cache.delete(lock_key)
+    performance.record_cache(hit=False)
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        deadline = time.time() + LOCK_WAIT
+        while time.time() < deadline:
+            time.sleep(LOCK_POLL)
+            entry = cache.get(key)
+            if entry is not None and (is_fresh is None or is_fresh(entry[0])):
+                return entry[0]
+        return compute()
+    try:
+        return _compute_and_store(key, compute, timeout)
+    finally:
+        cache.delete(lock_key)
@@ -0,0 +1,197 @@
+"""Общий для воркеров кэш в файле SQLite.
+
+Нужен там, где нет Redis и Memcached: все процессы одной машины видят
+одни и те же записи и сбросы версий. В отличие от FileBasedCache,
+cache.add здесь атомарен — это один INSERT ... ON CONFLICT, на нём
+держится блокировка от «набега» в core.cache. Запись не перечитывает
+весь кэш: устаревшие строки удаляются изредка, по индексу срока.
+
+LOCATION — путь к файлу базы, каталог создаётся при подключении.
+"""
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from core.db.backends.sqlite3.base import DEFAULT_PRAGMAS, apply_pragmas
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL'
+    ') WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)',
+)
+UPSERT = (
+    'INSERT INTO cache (key, value, expires) VALUES (?, ?, ?) '
+    'ON CONFLICT (key) DO UPDATE SET '
+    'value = excluded.value, expires = excluded.expires'
+)
+# Столько ключей уходит в один запрос IN (...).
+CHUNK_SIZE = 500
+# Доля записей, после которых кэш чистится от устаревших строк.
+CULL_PROBABILITY = 0.01
+FOREVER = float('inf')
+
+
+def chunks(items):
+    items = list(items)
+    for start in range(0, len(items), CHUNK_SIZE):
+        yield items[start:start + CHUNK_SIZE]
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.path = location
+        self.local = threading.local()
+
+    @property
+    def connection(self):
+        # Соединение своё у каждого потока и у каждого процесса после fork.
+        pid = os.getpid()
+        if getattr(self.local, 'pid', None) != pid:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None,
+                check_same_thread=False)
+            apply_pragmas(connection, DEFAULT_PRAGMAS)
+            for statement in SCHEMA:
+                connection.execute(statement)
+            self.local.connection, self.local.pid = connection, pid
+        return self.local.connection
+
+    @contextmanager
+    def transaction(self):
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def expiry(self, timeout):
+        expires = self.get_backend_timeout(timeout)
+        return FOREVER if expires is None else expires
+
+    def get(self, key, default=None, version=None):
+        row = self.connection.execute(
+            'SELECT value FROM cache WHERE key = ? AND expires > ?',
+            (self.key(key, version), time.time())).fetchone()
+        return default if row is None else pickle.loads(row[0])
+
+    def get_many(self, keys, version=None):
+        keys = {self.key(key, version): key for key in keys}
+        found = {}
+        now = time.time()
+        for chunk in chunks(keys):
+            rows = self.connection.execute(
+                f'SELECT key, value FROM cache WHERE key IN '
+                f'({", ".join("?" * len(chunk))}) AND expires > ?',
+                (*chunk, now))
+            for key, value in rows:
+                found[keys[key]] = pickle.loads(value)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.connection.execute(UPSERT, (
+            self.key(key, version),
+            pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+            self.expiry(timeout)))
+        self.maybe_cull()
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.expiry(timeout)
+        rows = [
+            (self.key(key, version),
+             pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires)
+            for key, value in data.items()]
+        with self.transaction() as connection:
+            connection.executemany(UPSERT, rows)
+        self.maybe_cull()
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """Записывает, только если ключа нет или он устарел; атомарно."""
+        cursor = self.connection.execute(
+            UPSERT + ' WHERE cache.expires <= ?', (
+                self.key(key, version),
+                pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                self.expiry(timeout), time.time()))
+        return cursor.rowcount == 1
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        cursor = self.connection.execute(
+            'UPDATE cache SET expires = ? WHERE key = ? AND expires > ?',
+            (self.expiry(timeout), self.key(key, version), time.time()))
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self.key(key, version)
+        with self.transaction() as connection:
+            row = connection.execute(
+                'SELECT value FROM cache WHERE key = ? AND expires > ?',
+                (key, time.time())).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            connection.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key))
+        return value
+
+    def has_key(self, key, version=None):
+        row = self.connection.execute(
+            'SELECT 1 FROM cache WHERE key = ? AND expires > ?',
+            (self.key(key, version), time.time())).fetchone()
+        return row is not None
+
+    def delete(self, key, version=None):
+        cursor = self.connection.execute(
+            'DELETE FROM cache WHERE key = ?', (self.key(key, version),))
+        return cursor.rowcount == 1
+
+    def delete_many(self, keys, version=None):
+        keys = [self.key(key, version) for key in keys]
+        with self.transaction() as connection:
+            for chunk in chunks(keys):
+                connection.execute(
+                    f'DELETE FROM cache WHERE key IN '
+                    f'({", ".join("?" * len(chunk))})', chunk)
+
+    def clear(self):
+        self.connection.execute('DELETE FROM cache')
+
+    def maybe_cull(self):
+        if random.random() < CULL_PROBABILITY:
+            self.cull()
+
+    def cull(self):
+        """Удаляет устаревшие строки и лишнее сверх MAX_ENTRIES."""
+        with self.transaction() as connection:
+            connection.execute(
+                'DELETE FROM cache WHERE expires <= ?', (time.time(),))
+            count, = connection.execute(
+                'SELECT COUNT(*) FROM cache').fetchone()
+            if count <= self._max_entries:
+                return
+            # Как в кэшах Django: уходит 1/CULL_FREQUENCY записей,
+            # ближайших к истечению, а при CULL_FREQUENCY = 0 — все.
+            limit = (count // self._cull_frequency
+                     if self._cull_frequency else count)
+            connection.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                'ORDER BY expires LIMIT ?)', (max(limit, 1),))
@@ -0,0 +1,27 @@
+"""Замена настоящей репликации для локальной проверки с SQLite.
+
+Копирует основную базу в файлы реплик через sqlite3 backup API:
+копия согласована на момент начала и не блокирует писателей надолго.
+"""
+import sqlite3
+
+from django.conf import settings
+from django.db import connections
+
+
+def backup(source, target_path):
+    """Копирует базу открытого соединения sqlite3 в файл target_path."""
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+
+
+def replicate(source_alias='default'):
+    """Обновляет все реплики из DATABASE_REPLICAS."""
+    source = connections[source_alias]
+    source.ensure_connection()
+    for alias in settings.DATABASE_REPLICAS:
+        connections[alias].close()
+        backup(source.connection, connections[alias].settings_dict['NAME'])
@@ -0,0 +1,71 @@
+"""Чтение лент с реплик базы.
+
+Представления, помеченные @use_replica, на GET-запросах читают
+со случайной реплики из DATABASE_REPLICAS; всё остальное, включая любую
+запись, идёт в основную базу 'default'. Чтобы пользователь сразу видел
+свой пост, комментарий или подписку, после записи ему ставится cookie,
+и на REPLICA_PIN_SECONDS его чтения закрепляются за основной базой.
+"""
+import random
+import threading
+
+from django.conf import settings
+
+PIN_COOKIE = 'pin_primary'
+
+_state = threading.local()
+
+
+def use_replica(view):
+    """Помечает представление, которому достаточно данных с реплики."""
+    view.use_replica = True
+    return view
+
+
+def reading_replica():
+    """Текущий запрос читает с реплики, которая может отставать."""
+    return getattr(_state, 'replica', None) is not None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return getattr(_state, 'replica', None) or 'default'
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    """Выбирает базу для чтения и закрепляет писавших за основной."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.replica = None
+        _state.wrote = False
+        try:
+            response = self.get_response(request)
+            wrote = _state.wrote
+        finally:
+            _state.replica = None
+            _state.wrote = False
+        if wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (settings.DATABASE_REPLICAS
+                and getattr(view_func, 'use_replica', False)
+                and request.method in ('GET', 'HEAD')
+                and PIN_COOKIE not in request.COOKIES):
+            _state.replica = random.choice(settings.DATABASE_REPLICAS)
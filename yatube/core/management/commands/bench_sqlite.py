@@ -0,0 +1,119 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.db.backends.sqlite3.base import DEFAULT_PRAGMAS, apply_pragmas
+
+MODES = {
+    # Настройки sqlite3 по умолчанию: журнал DELETE, обычный BEGIN.
+    'default': ({}, 'BEGIN'),
+    'tuned': (DEFAULT_PRAGMAS, 'BEGIN IMMEDIATE'),
+}
+
+
+class Workload:
+    """Читатели и писатели одного режима над одним файлом базы."""
+
+    def __init__(self, path, pragmas, begin):
+        self.path = path
+        self.pragmas = pragmas
+        self.begin = begin
+        self.stop = threading.Event()
+        self.counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        self.lock = threading.Lock()
+
+    def connect(self):
+        conn = sqlite3.connect(
+            self.path, timeout=5, isolation_level=None,
+            check_same_thread=False)
+        apply_pragmas(conn, self.pragmas)
+        return conn
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    def reader(self):
+        conn = self.connect()
+        while not self.stop.is_set():
+            try:
+                conn.execute('SELECT id, text FROM post '
+                             'ORDER BY pub_date DESC LIMIT 10').fetchall()
+                self.count('reads')
+            except sqlite3.OperationalError:
+                self.count('errors')
+        conn.close()
+
+    def writer(self):
+        conn = self.connect()
+        while not self.stop.is_set():
+            try:
+                conn.execute(self.begin)
+                conn.execute(
+                    'INSERT INTO post (text, pub_date) VALUES (?, ?)',
+                    ('Новый пост', time.time()))
+                conn.execute('COMMIT')
+                self.count('writes')
+            except sqlite3.OperationalError:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                self.count('errors')
+        conn.close()
+
+    def run(self, readers, writers, seconds):
+        """Операций в секунду за seconds секунд нагрузки."""
+        threads = (
+            [threading.Thread(target=self.reader) for _ in range(readers)]
+            + [threading.Thread(target=self.writer) for _ in range(writers)]
+        )
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        return {name: value / seconds for name, value in self.counts.items()}
+
+
+class Command(BaseCommand):
+    help = ('Пропускная способность чтения SQLite при параллельной записи: '
+            'настройки по умолчанию против core.db.backends.sqlite3.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--rows', type=int, default=10000)
+
+    def prepare(self, path, rows):
+        conn = sqlite3.connect(path)
+        conn.execute('CREATE TABLE post (id INTEGER PRIMARY KEY, '
+                     'text TEXT NOT NULL, pub_date REAL NOT NULL)')
+        conn.execute('CREATE INDEX post_pub_date ON post (pub_date)')
+        conn.executemany(
+            'INSERT INTO post (text, pub_date) VALUES (?, ?)',
+            ((f'Пост {i}', i) for i in range(rows)))
+        conn.commit()
+        conn.close()
+
+    def handle(self, *args, **options):
+        for mode, (pragmas, begin) in MODES.items():
+            directory = tempfile.mkdtemp()
+            path = os.path.join(directory, 'bench.sqlite3')
+            try:
+                self.prepare(path, options['rows'])
+                result = Workload(path, pragmas, begin).run(
+                    options['readers'], options['writers'],
+                    options['seconds'])
+            finally:
+                for name in os.listdir(directory):
+                    os.remove(os.path.join(directory, name))
+                os.rmdir(directory)
+            self.stdout.write(
+                f'{mode:>8}: чтений {result["reads"]:9.0f}/с, '
+                f'записей {result["writes"]:7.0f}/с, '
+                f'ошибок {result["errors"]:5.1f}/с')
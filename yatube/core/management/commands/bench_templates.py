@@ -0,0 +1,122 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.template.backends import DjangoTemplates
+from posts.models import Group, Post
+
+User = get_user_model()
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+MODES = {
+    # Как при DEBUG: шаблоны читаются и разбираются на каждый рендер.
+    'debug': LOADERS,
+    'cached': [('django.template.loaders.cached.Loader', LOADERS)],
+    'inlined': [('django.template.loaders.cached.Loader', [
+        ('core.template.loaders.Loader', LOADERS),
+    ])],
+}
+# Посты бенчмарка выдуманы: их карточки не должны попасть в общий кэш.
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bench-templates',
+    },
+}
+
+
+def percentile(timings, share):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * share))]
+
+
+class Command(BaseCommand):
+    help = ('Время рендера страницы ленты без кэша шаблонов, с кэшем, '
+            'со встроенными включениями и на Jinja2, если он подключён.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--template', default='posts/index.html')
+        parser.add_argument('--posts', type=int, default=settings.POSTS_MAX)
+        parser.add_argument('--renders', type=int, default=300)
+
+    def engine(self, name, loaders):
+        options = settings.TEMPLATES[0]
+        return DjangoTemplates({
+            'NAME': f'bench-{name}',
+            'DIRS': options['DIRS'],
+            'APP_DIRS': False,
+            'OPTIONS': {**options['OPTIONS'], 'loaders': loaders},
+        })
+
+    def engines(self):
+        engines = {name: self.engine(name, loaders)
+                   for name, loaders in MODES.items()}
+        for options in settings.TEMPLATES[1:]:
+            options = options.copy()
+            backend = options.pop('BACKEND')
+            if backend == 'core.template.jinja2.Jinja2':
+                engines['jinja2'] = import_string(backend)(
+                    {**options, 'NAME': 'bench-jinja2', 'APP_DIRS': False})
+        return engines
+
+    def context(self, count):
+        """Страница постов в памяти: рендер без запросов к базе."""
+        author = User(id=1, username='author',
+                      first_name='Имя', last_name='Фамилия')
+        group = Group(id=1, title='Группа', slug='group')
+        now = timezone.now()
+        posts = [
+            Post(id=pk, text=f'Текст поста {pk} ' * 10, pub_date=now,
+                 author=author, group=group, comments_count=pk)
+            for pk in range(count, 0, -1)
+        ]
+        return {'page_obj': Paginator(posts, count).page(1)}
+
+    def render(self, engine, template_name, context, request):
+        # Кэш карточек общий для режимов: без очистки режим мерил бы
+        # обвязку страницы вокруг карточек, нарисованных другим.
+        cache.clear()
+        started = time.perf_counter()
+        html = engine.get_template(template_name).render(context, request)
+        return (time.perf_counter() - started) * 1000, html
+
+    def handle(self, *args, **options):
+        with override_settings(CACHES=BENCHMARK_CACHES):
+            self.run(options)
+
+    def run(self, options):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        context = self.context(options['posts'])
+        template_name = options['template']
+        engines = self.engines()
+        timings = {name: [] for name in engines}
+        pages = {}
+        # Первый рендер компилирует шаблоны и в замер не входит.
+        for name, engine in engines.items():
+            self.render(engine, template_name, context, request)
+        # Режимы чередуются, чтобы фоновая нагрузка делилась поровну.
+        for _ in range(options['renders']):
+            for name, engine in engines.items():
+                elapsed, pages[name] = self.render(
+                    engine, template_name, context, request)
+                timings[name].append(elapsed)
+        for name, values in timings.items():
+            self.stdout.write(
+                f'{name:>8}: p50 {statistics.median(values):7.3f} мс, '
+                f'p95 {percentile(values, 0.95):7.3f} мс')
+        # Движки расставляют пробелы по-разному, сравнивается текст.
+        if len({' '.join(html.split()) for html in pages.values()}) != 1:
+            self.stderr.write('Разметка в режимах различается.')
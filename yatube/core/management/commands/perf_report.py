@@ -0,0 +1,54 @@
+import json
+import os
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Сводка худших SQL-запросов из отчёта QUERY_LOG_FILE.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=None)
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--kind', choices=('duplicate', 'slow'))
+
+    def records(self, path):
+        # Сначала старая часть ротируемого файла, затем текущая.
+        for name in (path + '.1', path):
+            if not os.path.exists(name):
+                continue
+            with open(name, encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def handle(self, *args, **options):
+        path = options['file'] or settings.QUERY_LOG_FILE
+        offenders = defaultdict(lambda: {
+            'hits': 0, 'queries': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        for record in self.records(path):
+            if options['kind'] and record['kind'] != options['kind']:
+                continue
+            key = (record['kind'], record['view'], record['fingerprint'])
+            stats = offenders[key]
+            stats['sql'] = record['sql']
+            stats['hits'] += 1
+            stats['queries'] += record['count']
+            stats['total_ms'] += record['total_ms']
+            stats['max_ms'] = max(stats['max_ms'], record['max_ms'])
+        if not offenders:
+            self.stdout.write('Отчёт пуст')
+            return
+        worst = sorted(offenders.items(),
+                       key=lambda item: item[1]['total_ms'], reverse=True)
+        for (kind, view, key), stats in worst[:options['limit']]:
+            self.stdout.write(
+                f'[{kind}] {view} {key}: запросов {stats["hits"]}, '
+                f'выполнений {stats["queries"]}, '
+                f'всего {stats["total_ms"]:.1f} мс, '
+                f'максимум {stats["max_ms"]:.1f} мс')
+            self.stdout.write(f'    {stats["sql"][:200]}')
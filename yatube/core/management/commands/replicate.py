@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.db.replication import replicate
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в файлы реплик — для локальной '
+            'проверки чтения с реплик.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять каждые N секунд; 0 — скопировать один раз.')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не настроены: задайте SQLITE_REPLICAS')
+        while True:
+            replicate()
+            self.stdout.write(
+                f'Реплики обновлены: {", ".join(settings.DATABASE_REPLICAS)}')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,53 @@
+import json
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import performance
+
+logger = logging.getLogger('yatube.performance')
+
+
+class PerformanceMiddleware:
+    """Замеряет время, SQL, шаблоны и кэш каждого запроса.
+
+    Итог отдаётся клиенту в заголовке Server-Timing, пишется в журнал
+    одной JSON-строкой и копится в реестре для /metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = performance.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            performance.finish()
+        duration = metrics.duration
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        performance.registry.add(
+            view, response.status_code, duration, metrics)
+        response['Server-Timing'] = metrics.server_timing(duration)
+        level = logging.INFO
+        if duration * 1000 >= settings.PERFORMANCE_SLOW_REQUEST_MS:
+            level = logging.WARNING
+        logger.log(level, json.dumps({
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'queries': metrics.queries,
+            'sql_ms': round(metrics.sql_time * 1000, 2),
+            'template_ms': round(metrics.template_time * 1000, 2),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+        }, ensure_ascii=False))
+        return response
@@ -0,0 +1,159 @@
+"""Метрики производительности запросов.
+
+Middleware заводит на время запроса объект RequestMetrics, куда обёртка
+курсора, шаблонный бэкенд и core.cache складывают свои замеры. После
+ответа метрики уходят в заголовок Server-Timing, в журнал и в общий
+для процесса реестр, который отдаётся по /metrics в формате Prometheus.
+Реестр у каждого воркера свой: суммирует их сам Prometheus.
+"""
+import threading
+import time
+from collections import defaultdict
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def duration(self):
+        return time.perf_counter() - self.started
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - started
+
+    def server_timing(self, duration):
+        return ', '.join((
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'cache;desc="hit={self.cache_hits} miss={self.cache_misses}"',
+            f'total;dur={duration * 1000:.1f}',
+        ))
+
+
+def start():
+    _local.metrics = RequestMetrics()
+    return _local.metrics
+
+
+def finish():
+    _local.metrics = None
+
+
+def current():
+    """Метрики текущего запроса или None вне запроса."""
+    return getattr(_local, 'metrics', None)
+
+
+def record_template(seconds):
+    metrics = current()
+    if metrics is not None:
+        metrics.template_time += seconds
+
+
+def record_cache(hit):
+    metrics = current()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+class Registry:
+    """Накопленные за жизнь процесса метрики по представлениям."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.requests = defaultdict(int)
+        self.buckets = defaultdict(lambda: [0] * len(BUCKETS))
+        self.seconds = defaultdict(float)
+        self.queries = defaultdict(int)
+        self.sql_seconds = defaultdict(float)
+        self.template_seconds = defaultdict(float)
+        self.cache = defaultdict(int)
+
+    def add(self, view, status, duration, metrics):
+        with self.lock:
+            self.requests[view, status] += 1
+            self.seconds[view] += duration
+            for index, bound in enumerate(BUCKETS):
+                if duration <= bound:
+                    self.buckets[view][index] += 1
+            self.queries[view] += metrics.queries
+            self.sql_seconds[view] += metrics.sql_time
+            self.template_seconds[view] += metrics.template_time
+            self.cache[view, 'hit'] += metrics.cache_hits
+            self.cache[view, 'miss'] += metrics.cache_misses
+
+    def render(self):
+        """Текстовый формат Prometheus (exposition format 0.0.4)."""
+        with self.lock:
+            lines = [
+                '# HELP yatube_requests_total Обработанные запросы.',
+                '# TYPE yatube_requests_total counter',
+            ]
+            for (view, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'yatube_requests_total{{view="{view}",'
+                    f'status="{status}"}} {count}')
+            lines += [
+                '# HELP yatube_request_duration_seconds Время ответа.',
+                '# TYPE yatube_request_duration_seconds histogram',
+            ]
+            totals = defaultdict(int)
+            for (view, _), count in self.requests.items():
+                totals[view] += count
+            for view in sorted(totals):
+                name = 'yatube_request_duration_seconds'
+                for bound, count in zip(BUCKETS, self.buckets[view]):
+                    lines.append(
+                        f'{name}_bucket{{view="{view}",le="{bound}"}} {count}')
+                lines += [
+                    f'{name}_bucket{{view="{view}",le="+Inf"}} '
+                    f'{totals[view]}',
+                    f'{name}_sum{{view="{view}"}} {self.seconds[view]:.6f}',
+                    f'{name}_count{{view="{view}"}} {totals[view]}',
+                ]
+            for name, help_text, values in (
+                ('yatube_db_queries_total', 'Запросы к базе.', self.queries),
+                ('yatube_db_seconds_total', 'Время SQL.', self.sql_seconds),
+                ('yatube_template_seconds_total', 'Время рендера шаблонов.',
+                 self.template_seconds),
+            ):
+                lines += [f'# HELP {name} {help_text}',
+                          f'# TYPE {name} counter']
+                for view in sorted(values):
+                    lines.append(f'{name}{{view="{view}"}} {values[view]}')
+            lines += [
+                '# HELP yatube_cache_requests_total Обращения к кэшу.',
+                '# TYPE yatube_cache_requests_total counter',
+            ]
+            for (view, result), count in sorted(self.cache.items()):
+                lines.append(
+                    f'yatube_cache_requests_total{{view="{view}",'
+                    f'result="{result}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
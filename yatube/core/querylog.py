@@ -0,0 +1,122 @@
+"""Выборочный поиск медленных и повторяющихся SQL-запросов.
+
+На доле запросов (QUERY_LOG_SAMPLE_RATE) соединения с базой оборачиваются
+инспектором: он приводит SQL к отпечатку — без литералов и параметров —
+и считает запросы по отпечаткам. Повторы сверх QUERY_LOG_DUPLICATES
+(типичное N+1) и запросы дольше QUERY_LOG_SLOW_MS пишутся JSON-строками
+в ротируемый файл QUERY_LOG_FILE; сводку строит manage.py perf_report.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import time
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.db import connections
+
+NORMALIZE = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(?)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+_logger = None
+
+
+def normalize(sql):
+    """SQL без литералов: запросы, отличающиеся лишь значениями, совпадут."""
+    for pattern, replacement in NORMALIZE:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize(sql).encode()).hexdigest()[:12]
+
+
+def report_logger():
+    """Журнал отчёта с ротацией по размеру; создаётся при первой записи."""
+    global _logger
+    path = settings.QUERY_LOG_FILE
+    if _logger is None or _logger.path != path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        logger = logging.getLogger('yatube.querylog')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+            handler.close()
+        logger.addHandler(RotatingFileHandler(
+            path, maxBytes=settings.QUERY_LOG_MAX_BYTES, backupCount=1,
+            encoding='utf-8'))
+        logger.path = path
+        _logger = logger
+    return _logger
+
+
+class QueryInspector:
+    """Собирает запросы одного HTTP-запроса по отпечаткам."""
+
+    def __init__(self):
+        self.queries = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            key = fingerprint(sql)
+            stats = self.queries.setdefault(
+                key, {'sql': normalize(sql), 'count': 0,
+                      'total_ms': 0.0, 'max_ms': 0.0})
+            stats['count'] += 1
+            stats['total_ms'] += elapsed
+            stats['max_ms'] = max(stats['max_ms'], elapsed)
+
+    def problems(self):
+        """Записи о повторах и медленных запросах."""
+        for key, stats in self.queries.items():
+            kinds = []
+            if stats['count'] > settings.QUERY_LOG_DUPLICATES:
+                kinds.append('duplicate')
+            if stats['max_ms'] >= settings.QUERY_LOG_SLOW_MS:
+                kinds.append('slow')
+            for kind in kinds:
+                yield {
+                    'kind': kind,
+                    'fingerprint': key,
+                    'sql': stats['sql'],
+                    'count': stats['count'],
+                    'total_ms': round(stats['total_ms'], 3),
+                    'max_ms': round(stats['max_ms'], 3),
+                }
+
+
+class QueryLogMiddleware:
+    """Проверяет выборку запросов и пишет найденное в отчёт."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.QUERY_LOG_SAMPLE_RATE:
+            return self.get_response(request)
+        inspector = QueryInspector()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(inspector))
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        for problem in inspector.problems():
+            problem.update(time=time.time(), view=view, path=request.path)
+            report_logger().info(json.dumps(problem, ensure_ascii=False))
+        return response
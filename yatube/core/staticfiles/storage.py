@@ -0,0 +1,69 @@
+"""Статика с хэшем содержимого в имени и заранее сжатыми копиями.
+
+ManifestStaticFilesStorage при collectstatic копирует файлы под именами
+вида bootstrap.min.3f2a1c.css и пишет соответствие в staticfiles.json.
+Такой файл никогда не меняется, и браузер может кэшировать его навсегда.
+Здесь к каждому текстовому файлу добавляются копии .gz и, если
+установлен brotli, .br: сжимать их на лету при каждом запросе не нужно,
+core.staticfiles.wsgi отдаёт готовый вариант.
+"""
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    # brotli необязателен: без него собираются только .gz.
+    brotli = None
+
+# Уже сжатые форматы: повторное сжатие почти ничего не даёт.
+NOT_COMPRESSED = frozenset((
+    '.br', '.gz', '.zip', '.bz2', '.xz', '.png', '.jpg', '.jpeg', '.gif',
+    '.webp', '.avif', '.ico', '.woff', '.woff2', '.mp3', '.mp4', '.webm',
+    '.ogg', '.pdf',
+))
+MIN_SIZE = 256
+# Копия хранится, только если она заметно меньше оригинала.
+MAX_RATIO = 0.95
+
+
+def compressors():
+    """Расширение копии → функция сжатия."""
+    result = {'.gz': lambda data: gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        result['.br'] = lambda data: brotli.compress(data, quality=11)
+    return result
+
+
+def compressible(name):
+    return os.path.splitext(name)[1].lower() not in NOT_COMPRESSED
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set()
+        for name in paths:
+            names.add(name)
+            names.add(self.stored_name(name))
+        for name in sorted(filter(compressible, names)):
+            self.compress(name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as file:
+            data = file.read()
+        for suffix, function in compressors().items():
+            # Копия от прежней версии файла без хэша не должна остаться.
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+            if len(data) < MIN_SIZE:
+                continue
+            compressed = function(data)
+            if len(compressed) <= len(data) * MAX_RATIO:
+                with open(path + suffix, 'wb') as file:
+                    file.write(compressed)
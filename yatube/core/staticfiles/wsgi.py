@@ -0,0 +1,250 @@
+"""Раздача статики и медиа на уровне WSGI, до Django.
+
+django.conf.urls.static проводит каждый файл через все middleware
+и разрешение URL и читает его целиком. StaticFiles оборачивает
+WSGI-приложение и отвечает на STATIC_URL и MEDIA_URL сам:
+
+* статика описывается один раз при запуске по STATIC_ROOT (после
+  collectstatic нужен перезапуск, как и для кэша шаблонов);
+* файлы с хэшем из манифеста отдаются с Cache-Control immutable на год,
+  остальные — на settings.FILES_MAX_AGE секунд;
+* из готовых копий .br и .gz выбирается та, что указана
+  в Accept-Encoding;
+* поддерживаются HEAD, If-None-Match, If-Modified-Since и Range
+  с одним диапазоном — диапазон берётся из несжатого файла.
+
+Медиа загружаются пользователями во время работы, поэтому файл ищется
+на диске при каждом запросе и без сжатых копий.
+"""
+import json
+import mimetypes
+import os
+import re
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.handlers.wsgi import get_path_info
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Порядок предпочтения: brotli сжимает текст лучше gzip.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+BLOCK_SIZE = 64 * 1024
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+TEXT_TYPES = ('application/javascript', 'application/json', 'image/svg+xml')
+
+
+def content_type(path):
+    mime, _ = mimetypes.guess_type(path)
+    mime = mime or 'application/octet-stream'
+    if mime.startswith('text/') or mime in TEXT_TYPES:
+        return f'{mime}; charset=utf-8'
+    return mime
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, кроме запрещённых через q=0."""
+    accepted = set()
+    for part in header.split(','):
+        name, *params = [item.strip() for item in part.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if name and quality > 0:
+            accepted.add(name.lower())
+    return accepted
+
+
+def byte_range(header, size):
+    """(начало, конец) включительно; None — отдать файл целиком.
+
+    Несколько диапазонов и непонятный заголовок отдаются целиком,
+    что разрешает RFC 7233. Для диапазона за концом файла — ValueError.
+    """
+    match = RANGE.match(header.replace(' ', ''))
+    if match is None or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        length = int(end)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size:
+        raise ValueError(header)
+    if end < start:
+        return None
+    return start, end
+
+
+class File:
+    """Файл на диске и его готовые сжатые копии."""
+
+    def __init__(self, path, cache_control, encodings=()):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.last_modified = http_date(stat.st_mtime)
+        self.mtime = int(stat.st_mtime)
+        self.etag = f'"{self.mtime:x}-{self.size:x}"'
+        self.headers = [
+            ('Content-Type', content_type(path)),
+            ('Last-Modified', self.last_modified),
+            ('Cache-Control', cache_control),
+            ('Accept-Ranges', 'bytes'),
+        ]
+        # Кодировка → (путь, размер, ETag) сжатой копии.
+        self.variants = {}
+        for encoding, suffix in encodings:
+            if os.path.isfile(path + suffix):
+                self.variants[encoding] = (
+                    path + suffix, os.path.getsize(path + suffix),
+                    f'"{self.mtime:x}-{self.size:x}-{encoding}"')
+        if self.variants:
+            self.headers.append(('Vary', 'Accept-Encoding'))
+
+    def etags(self):
+        return {self.etag} | {etag for _, _, etag in self.variants.values()}
+
+    def not_modified(self, environ):
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            tags = {tag.strip() for tag in if_none_match.split(',')}
+            tags |= {tag[2:] for tag in tags if tag.startswith('W/')}
+            return '*' in tags or bool(tags & self.etags())
+        since = parse_http_date_safe(
+            environ.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return since is not None and self.mtime <= since
+
+    def variant(self, environ):
+        """(путь, размер, ETag, Content-Encoding или None) для ответа."""
+        accepted = accepted_encodings(
+            environ.get('HTTP_ACCEPT_ENCODING', ''))
+        for encoding, _ in ENCODINGS:
+            if encoding in self.variants and encoding in accepted:
+                return (*self.variants[encoding], encoding)
+        return self.path, self.size, self.etag, None
+
+    def range(self, environ):
+        header = environ.get('HTTP_RANGE')
+        if header is None:
+            return None
+        if_range = environ.get('HTTP_IF_RANGE')
+        if if_range is not None and if_range not in (
+                self.etag, self.last_modified):
+            return None
+        return byte_range(header, self.size)
+
+
+def read(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            block = file.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+class StaticFiles:
+    """WSGI-обёртка, которая сама отвечает на запросы статики и медиа."""
+
+    def __init__(self, application, static_root=None, static_url=None,
+                 media_root=None, media_url=None):
+        self.application = application
+        self.static_url = static_url or settings.STATIC_URL
+        self.media_url = media_url or settings.MEDIA_URL
+        self.media_root = media_root or settings.MEDIA_ROOT
+        self.files = self.scan(static_root or settings.STATIC_ROOT)
+
+    def scan(self, root):
+        """Путь URL → File для всей собранной статики."""
+        files = {}
+        if not root or not os.path.isdir(root):
+            return files
+        hashed = set()
+        manifest = os.path.join(root, ManifestFilesMixin.manifest_name)
+        if os.path.isfile(manifest):
+            with open(manifest, encoding='utf-8') as file:
+                hashed = set(json.load(file).get('paths', {}).values())
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                if (name.endswith(suffixes)
+                        and os.path.isfile(os.path.splitext(path)[0])):
+                    continue
+                relative = os.path.relpath(path, root).replace(os.sep, '/')
+                cache_control = (
+                    IMMUTABLE if relative in hashed
+                    else f'public, max-age={settings.FILES_MAX_AGE}')
+                files[self.static_url + relative] = File(
+                    path, cache_control, ENCODINGS)
+        return files
+
+    def find(self, path):
+        if path.startswith(self.static_url):
+            # Чего нет в STATIC_ROOT, то остаётся за Django.
+            return self.files.get(path)
+        if self.media_root and path.startswith(self.media_url):
+            try:
+                full_path = safe_join(
+                    self.media_root, path[len(self.media_url):])
+            except SuspiciousFileOperation:
+                return None
+            if os.path.isfile(full_path):
+                return File(
+                    full_path, f'public, max-age={settings.FILES_MAX_AGE}')
+        return None
+
+    def __call__(self, environ, start_response):
+        file = self.find(get_path_info(environ))
+        if file is None:
+            return self.application(environ, start_response)
+        return self.serve(file, environ, start_response)
+
+    def serve(self, file, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        if method not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed', [
+                ('Allow', 'GET, HEAD'), ('Content-Length', '0')])
+            return []
+        headers = list(file.headers)
+        if file.not_modified(environ):
+            start_response('304 Not Modified', headers + [
+                ('ETag', file.variant(environ)[2])])
+            return []
+        try:
+            span = file.range(environ)
+        except ValueError:
+            start_response('416 Range Not Satisfiable', headers + [
+                ('Content-Range', f'bytes */{file.size}'),
+                ('Content-Length', '0')])
+            return []
+        if span is not None:
+            start, end = span
+            length = end - start + 1
+            start_response('206 Partial Content', headers + [
+                ('ETag', file.etag),
+                ('Content-Range', f'bytes {start}-{end}/{file.size}'),
+                ('Content-Length', str(length))])
+            return [] if method == 'HEAD' else read(file.path, start, length)
+        path, size, etag, encoding = file.variant(environ)
+        headers += [('ETag', etag), ('Content-Length', str(size))]
+        if encoding is not None:
+            headers.append(('Content-Encoding', encoding))
+        start_response('200 OK', headers)
+        if method == 'HEAD':
+            return []
+        wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return wrapper(open(path, 'rb'), BLOCK_SIZE)
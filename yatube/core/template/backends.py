@@ -0,0 +1,31 @@
+"""Шаблонные бэкенды, которые учитывают время рендера в метриках."""
+import time
+
+from django.template.backends import django
+
+from core import performance
+
+
+class InstrumentedTemplate:
+    """Обёртка шаблона бэкенда; остальные атрибуты — как у исходного."""
+
+    def __init__(self, template):
+        self._wrapped = template
+
+    def __getattr__(self, name):
+        return getattr(self._wrapped, name)
+
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return self._wrapped.render(context, request)
+        finally:
+            performance.record_template(time.perf_counter() - started)
+
+
+class DjangoTemplates(django.DjangoTemplates):
+    def from_string(self, template_code):
+        return InstrumentedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name))
@@ -0,0 +1,92 @@
+"""Jinja2 для лент: окружение с аналогами тегов и фильтров проекта.
+
+Подключается в TEMPLATES, только если установлен jinja2; какие
+представления рендерятся им, задаёт settings.JINJA2_VIEWS. Шаблоны
+лежат в templates_jinja2/ рядом с templates/ и повторяют их разметку.
+Карточки постов кэширует posts.fragments, а рисует их Jinja2 по
+своим шаблонам, повторяющим карточки templates/.
+"""
+import time
+
+import jinja2
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template import Context, defaultfilters
+from django.template.backends import jinja2 as backend
+from django.test.signals import template_rendered
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from core import performance
+
+ARTICLE = 'posts/includes/article.html'
+
+
+def url(name, *args, **kwargs):
+    """Аналог {% url %}: url('posts:profile', username)."""
+    return reverse(name, args=args or None, kwargs=kwargs or None)
+
+
+def date(value, arg=None):
+    """Фильтр date из Django: дата в текущем часовом поясе."""
+    return defaultfilters.date(timezone.template_localtime(value), arg)
+
+
+@jinja2.pass_environment
+def post_cards(env, posts, template_name=ARTICLE, **extra):
+    """Аналог {% post_card %}: карточки страницы, id поста → разметка."""
+    from posts.fragments import render_cards
+
+    cards = render_cards(posts, template_name, engine=env, **extra)
+    return {pk: mark_safe(html) for pk, html in cards.items()}
+
+
+def environment(**options):
+    # Отсутствующие переменные молча пусты, как в шаблонах Django.
+    options['undefined'] = jinja2.ChainableUndefined
+    env = jinja2.Environment(**options)
+    env.globals.update({
+        'url': url,
+        'static': staticfiles_storage.url,
+        'post_cards': post_cards,
+    })
+    env.filters['date'] = date
+    return env
+
+
+class RenderedContext(Context):
+    """Контекст для сигнала template_rendered.
+
+    Тестовый клиент отдаёт единственный отрендеренный контекст как есть,
+    а тесты проекта перебирают его ключи через keys().
+    """
+
+    def keys(self):
+        return self.flatten().keys()
+
+
+class Template(backend.Template):
+    """Шаблон, который учитывается в метриках и виден тестовому клиенту."""
+
+    def render(self, context=None, request=None):
+        context = {} if context is None else context
+        started = time.perf_counter()
+        try:
+            html = super().render(context, request)
+        finally:
+            performance.record_template(time.perf_counter() - started)
+        # Django шлёт этот сигнал только из своих шаблонов; без него
+        # response.context и assertTemplateUsed не работали бы.
+        template_rendered.send(
+            sender=self, template=self.template,
+            context=RenderedContext(context))
+        return html
+
+
+class Jinja2(backend.Jinja2):
+    def from_string(self, template_code):
+        return Template(self.env.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return Template(template.template, self)
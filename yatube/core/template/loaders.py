@@ -0,0 +1,72 @@
+"""Загрузчик, который встраивает {% include %} в шаблон при компиляции.
+
+{% include 'имя' %} внутри {% for %} на каждой итерации ищет шаблон,
+заводит для него состояние рендера и рендерит отдельный Template.
+Этот загрузчик подставляет текст включаемого шаблона на место тега
+ещё до разбора, и лента рендерится одним проходом по одному дереву узлов.
+Вместе с django.template.loaders.cached.Loader страница компилируется
+один раз на процесс.
+
+Встраиваются только включения с постоянным именем. Остаются как есть
+включения с only, по переменной и шаблоны с {% extends %} или
+{% block %}: у них своя семантика, которую подстановка текста нарушит.
+"""
+import re
+
+from django.template import TemplateDoesNotExist
+from django.template.loaders.base import Loader as BaseLoader
+
+INCLUDE = re.compile(
+    r'{%\s*include\s+(?P<quote>[\'"])(?P<name>[^\'"]+)(?P=quote)'
+    r'(?:\s+with\s+(?P<extra>.*?))?\s*%}')
+NOT_INLINED = re.compile(r'{%\s*(?:extends|block)\b')
+
+
+class Loader(BaseLoader):
+    def __init__(self, engine, loaders):
+        super().__init__(engine)
+        self.loaders = engine.get_template_loaders(loaders)
+
+    def get_template_sources(self, template_name):
+        # Источник помечается этим загрузчиком, иначе cached.Loader
+        # прочитает его напрямую у вложенного и встраивание пропустит.
+        for loader in self.loaders:
+            for origin in loader.get_template_sources(template_name):
+                origin.source_loader = loader
+                origin.loader = self
+                yield origin
+
+    def get_contents(self, origin):
+        return self.inline(self.raw(origin), {origin.template_name})
+
+    def raw(self, origin):
+        return origin.source_loader.get_contents(origin)
+
+    def source(self, template_name):
+        for origin in self.get_template_sources(template_name):
+            try:
+                return self.raw(origin)
+            except TemplateDoesNotExist:
+                continue
+        return None
+
+    def inline(self, source, seen):
+        """source с подставленными включениями; seen — от циклов."""
+        def replace(match):
+            name, extra = match.group('name'), match.group('extra')
+            if name in seen or (extra and re.search(r'\bonly$', extra)):
+                return match.group(0)
+            included = self.source(name)
+            if included is None or NOT_INLINED.search(included):
+                return match.group(0)
+            body = self.inline(included, seen | {name})
+            if extra:
+                return f'{{% with {extra} %}}{body}{{% endwith %}}'
+            return body
+
+        return INCLUDE.sub(replace, source)
+
+    def reset(self):
+        for loader in self.loaders:
+            if hasattr(loader, 'reset'):
+                loader.reset()
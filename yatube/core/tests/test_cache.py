@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core.cache import get_or_set
+
+
+class GetOrSetTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return f'значение {self.calls}'
+
+    def test_value_is_computed_once(self):
+        """Повторное чтение берёт значение из кэша"""
+        self.assertEqual(get_or_set('key', self.compute, 60), 'значение 1')
+        self.assertEqual(get_or_set('key', self.compute, 60), 'значение 1')
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_value_is_recomputed(self):
+        """is_fresh отбрасывает запись раньше срока"""
+        get_or_set('key', self.compute, 60)
+        value = get_or_set(
+            'key', self.compute, 60, is_fresh=lambda value: False)
+        self.assertEqual(value, 'значение 2')
+
+    def test_none_is_not_cached(self):
+        """Результат None не сохраняется"""
+        get_or_set('key', lambda: None, 60)
+        self.assertIsNone(cache.get('key'))
+
+    def test_waits_for_value_while_locked(self):
+        """Пока ключ пересчитывает другой процесс, значение ждут"""
+        cache.add('lock:key', 1)
+
+        def other_process_finishes(seconds):
+            cache.set('key', ('готово', 0, float('inf')))
+
+        with mock.patch('core.cache.time.sleep', other_process_finishes):
+            self.assertEqual(get_or_set('key', self.compute, 60), 'готово')
+        self.assertEqual(self.calls, 0)
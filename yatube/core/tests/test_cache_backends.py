@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.cache_backends.sqlite import SQLiteCache
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache = self.backend()
+
+    def backend(self, **options):
+        return SQLiteCache(
+            os.path.join(self.directory, 'cache', 'default.sqlite3'),
+            {'OPTIONS': options})
+
+    def test_values_are_shared_between_instances(self):
+        """Два процесса с одним файлом видят одни записи"""
+        self.cache.set_many({'a': {'x': 1}, 'b': [2]})
+        other = self.backend()
+        self.assertEqual(other.get_many(['a', 'b', 'c']),
+                         {'a': {'x': 1}, 'b': [2]})
+        other.delete_many(['a'])
+        self.assertIsNone(self.cache.get('a'))
+        self.assertTrue(self.cache.has_key('b'))
+
+    def test_add_respects_existing_and_expired_keys(self):
+        self.assertTrue(self.cache.add('lock', 1, 10))
+        self.assertFalse(self.cache.add('lock', 2, 10))
+        with mock.patch('core.cache_backends.sqlite.time.time',
+                        return_value=10 ** 12):
+            self.assertTrue(self.cache.add('lock', 3, 10))
+            self.assertEqual(self.cache.get('lock'), 3)
+
+    def test_add_is_atomic_between_threads(self):
+        """Из многих одновременных add успешен ровно один"""
+        results = []
+        barrier = threading.Barrier(8)
+
+        def take():
+            barrier.wait()
+            results.append(self.cache.add('lock', 1, 10))
+
+        threads = [threading.Thread(target=take) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 1)
+
+    def test_incr_and_touch(self):
+        self.cache.set('counter', 1)
+        self.assertEqual(self.cache.incr('counter', 2), 3)
+        self.assertEqual(self.cache.decr('counter'), 2)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+        self.assertTrue(self.cache.touch('counter', None))
+        self.assertFalse(self.cache.touch('missing'))
+
+    def test_cull_keeps_max_entries(self):
+        cache = self.backend(MAX_ENTRIES=10, CULL_FREQUENCY=2)
+        cache.set_many({f'key{i}': i for i in range(20)})
+        cache.cull()
+        count, = cache.connection.execute(
+            'SELECT COUNT(*) FROM cache').fetchone()
+        self.assertEqual(count, 10)
+
+    def test_cull_drops_expired_rows(self):
+        self.cache.set('short', 1, 10)
+        self.cache.set('long', 2, None)
+        with mock.patch('core.cache_backends.sqlite.time.time',
+                        return_value=10 ** 12):
+            self.cache.cull()
+        rows = self.cache.connection.execute('SELECT key FROM cache')
+        self.assertEqual([key for key, in rows], [':1:long'])
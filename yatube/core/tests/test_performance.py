@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.performance import registry
+
+
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+
+    def test_server_timing_header(self):
+        """Ответ несёт Server-Timing с SQL, шаблонами и кэшем"""
+        response = self.client.get('/')
+        timing = response['Server-Timing']
+        for part in ('db;dur=', 'queries', 'tpl;dur=', 'cache;desc=',
+                     'total;dur='):
+            self.assertIn(part, timing)
+        self.assertIn('miss=1', timing)
+        self.assertIn('hit=1', self.client.get('/')['Server-Timing'])
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint(self):
+        """/metrics отдаёт накопленные метрики в формате Prometheus"""
+        self.client.get('/')
+        self.client.get('/')
+        body = self.client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer secret').content.decode()
+        self.assertIn(
+            'yatube_requests_total{view="posts:index",status="200"} 2', body)
+        self.assertIn('yatube_request_duration_seconds_count'
+                      '{view="posts:index"} 2', body)
+        self.assertIn('yatube_cache_requests_total{view="posts:index",'
+                      'result="hit"} 1', body)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        """С токеном /metrics закрыт для запросов без него"""
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_without_token_only_in_debug(self):
+        """Без токена /metrics открыт только при DEBUG"""
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
@@ -0,0 +1,67 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from core.querylog import QueryInspector, normalize
+
+User = get_user_model()
+
+TEMP_DIR = tempfile.mkdtemp()
+REPORT = os.path.join(TEMP_DIR, 'queries.jsonl')
+
+
+@override_settings(QUERY_LOG_FILE=REPORT, QUERY_LOG_SAMPLE_RATE=1,
+                   QUERY_LOG_DUPLICATES=1)
+class QueryLogTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        open(REPORT, 'w').close()
+
+    def read_report(self):
+        with open(REPORT, encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_normalize_strips_literals(self):
+        """Отпечаток не зависит от значений в запросе"""
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE a = 'x''y' AND b IN (1, 2,  3)"),
+            normalize('SELECT *  FROM t WHERE a = %s AND b IN (%s)'),
+        )
+
+    def test_inspector_finds_duplicates(self):
+        """Повтор одного запроса сверх порога попадает в отчёт"""
+        inspector = QueryInspector()
+        with connection.execute_wrapper(inspector):
+            for pk in range(3):
+                User.objects.filter(pk=pk).first()
+        problems = list(inspector.problems())
+        self.assertEqual(len(problems), 1)
+        self.assertEqual(problems[0]['kind'], 'duplicate')
+        self.assertEqual(problems[0]['count'], 3)
+
+    @override_settings(QUERY_LOG_SLOW_MS=0)
+    def test_middleware_writes_report(self):
+        """Медленные запросы пишутся в отчёт с именем представления"""
+        self.client.get('/')
+        records = self.read_report()
+        self.assertTrue(records)
+        self.assertEqual(
+            {record['view'] for record in records}, {'posts:index'})
+        self.assertEqual(
+            {record['kind'] for record in records}, {'slow'})
+        out = StringIO()
+        call_command('perf_report', stdout=out)
+        self.assertIn('[slow] posts:index', out.getvalue())
@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.db.replication import backup
+from core.db.routers import (
+    PIN_COOKIE, ReplicaMiddleware, ReplicaRouter, use_replica)
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.seen = []
+
+    def request(self, view, method='get', **cookies):
+        request = getattr(self.factory, method)('/')
+        request.COOKIES.update(cookies)
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = ReplicaMiddleware(get_response)
+        return middleware(request)
+
+    def reading_view(self):
+        @use_replica
+        def view(request):
+            self.seen.append(self.router.db_for_read(User))
+            return HttpResponse()
+        return view
+
+    def test_marked_views_read_from_replica(self):
+        """Помеченные представления читают с реплики, прочие — с основной"""
+        self.request(self.reading_view())
+
+        def plain(request):
+            self.seen.append(self.router.db_for_read(User))
+            return HttpResponse()
+
+        self.request(plain)
+        self.request(self.reading_view(), method='post')
+        self.assertEqual(self.seen, ['replica', 'default', 'default'])
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_write_pins_to_primary(self):
+        """После записи пользователь читает из основной базы"""
+        def writer(request):
+            self.seen.append(self.router.db_for_write(User))
+            return HttpResponse()
+
+        response = self.request(writer)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.request(self.reading_view(), **{PIN_COOKIE: '1'})
+        self.assertEqual(self.seen, ['default', 'default'])
+
+    def test_backup_copies_database(self):
+        """Заменитель репликации копирует данные в файл реплики"""
+        with tempfile.TemporaryDirectory() as directory:
+            primary = sqlite3.connect(os.path.join(directory, 'db.sqlite3'))
+            primary.execute('CREATE TABLE post (text TEXT)')
+            primary.execute("INSERT INTO post VALUES ('Пост')")
+            primary.commit()
+            path = os.path.join(directory, 'replica.sqlite3')
+            backup(primary, path)
+            primary.close()
+            replica = sqlite3.connect(path)
+            rows = replica.execute('SELECT text FROM post').fetchall()
+            replica.close()
+        self.assertEqual(rows, [('Пост',)])
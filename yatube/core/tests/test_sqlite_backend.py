@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from core.db.backends.sqlite3.base import DatabaseWrapper
+
+
+class SQLiteBackendTests(SimpleTestCase):
+    def connect(self, path, **options):
+        settings_dict = {
+            'NAME': path, 'OPTIONS': options, 'CONN_MAX_AGE': 0,
+            'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False, 'TIME_ZONE': None,
+            'USER': '', 'PASSWORD': '', 'HOST': '', 'PORT': '',
+        }
+        wrapper = DatabaseWrapper(settings_dict)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        """Файл базы открывается в WAL с настроенными PRAGMA"""
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = self.connect(os.path.join(directory, 'db.sqlite3'))
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+            self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+            self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+            wrapper.close()
+
+    def test_options_override_defaults(self):
+        """PRAGMA из OPTIONS заменяют значения по умолчанию"""
+        wrapper = self.connect(
+            ':memory:', pragmas={'busy_timeout': 100},
+            transaction_mode='DEFERRED')
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 100)
+        self.assertEqual(wrapper.transaction_mode, 'DEFERRED')
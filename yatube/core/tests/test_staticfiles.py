@@ -0,0 +1,135 @@
+import gzip
+import os
+import shutil
+import tempfile
+from io import StringIO
+from wsgiref.util import setup_testing_defaults
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from core.staticfiles.wsgi import IMMUTABLE, StaticFiles
+
+CSS = 'body { margin: 0; }\n' * 200
+
+
+def django_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'django']
+
+
+class StaticFilesTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        source = os.path.join(cls.directory, 'source')
+        os.makedirs(os.path.join(source, 'css'))
+        with open(os.path.join(source, 'css', 'site.css'), 'w') as file:
+            file.write(CSS)
+        cls.static_root = os.path.join(cls.directory, 'static')
+        cls.media_root = os.path.join(cls.directory, 'media')
+        os.makedirs(os.path.join(cls.media_root, 'posts'))
+        media = os.path.join(cls.media_root, 'posts', 'a.txt')
+        with open(media, 'w') as file:
+            file.write('0123456789')
+        cls.settings = override_settings(
+            DEBUG=False,
+            STATIC_ROOT=cls.static_root,
+            STATICFILES_DIRS=[source],
+            STATICFILES_FINDERS=[
+                'django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATICFILES_STORAGE=(
+                'core.staticfiles.storage.'
+                'CompressedManifestStaticFilesStorage'),
+        )
+        cls.settings.enable()
+        call_command('collectstatic', interactive=False, stdout=StringIO())
+        cls.url = staticfiles_storage.url('css/site.css')
+        cls.app = StaticFiles(django_app, media_root=cls.media_root)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.directory)
+        super().tearDownClass()
+
+    def get(self, path, method='GET', **headers):
+        environ = {'PATH_INFO': path, 'REQUEST_METHOD': method, **headers}
+        setup_testing_defaults(environ)
+        response = {}
+
+        def start_response(status, headers):
+            response.update(status=status, headers=dict(headers))
+
+        body = b''.join(self.app(environ, start_response))
+        return response['status'], response['headers'], body
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        self.assertRegex(self.url, r'^/static/css/site\.[0-9a-f]{12}\.css$')
+        path = os.path.join(self.static_root, self.url[len('/static/'):])
+        with gzip.open(path + '.gz', 'rt') as file:
+            self.assertEqual(file.read(), CSS)
+
+    def test_hashed_file_is_immutable(self):
+        status, headers, body = self.get(self.url)
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Cache-Control'], IMMUTABLE)
+        self.assertEqual(headers['Content-Type'], 'text/css; charset=utf-8')
+        self.assertEqual(body.decode(), CSS)
+        status, headers, _ = self.get('/static/css/site.css')
+        self.assertNotIn('immutable', headers['Cache-Control'])
+
+    def test_compressed_variant(self):
+        """Готовая копия .gz выбирается по Accept-Encoding"""
+        status, headers, body = self.get(
+            self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(headers['Content-Length']), len(body))
+        self.assertEqual(gzip.decompress(body).decode(), CSS)
+        _, headers, _ = self.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertNotIn('Content-Encoding', headers)
+
+    def test_range(self):
+        status, headers, body = self.get(
+            self.url, HTTP_RANGE='bytes=5-9', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(status, '206 Partial Content')
+        self.assertEqual(headers['Content-Range'], f'bytes 5-9/{len(CSS)}')
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual(body.decode(), CSS[5:10])
+        _, _, body = self.get(self.url, HTTP_RANGE='bytes=-4')
+        self.assertEqual(body.decode(), CSS[-4:])
+        status, headers, _ = self.get(
+            self.url, HTTP_RANGE=f'bytes={len(CSS)}-')
+        self.assertEqual(status, '416 Range Not Satisfiable')
+        self.assertEqual(headers['Content-Range'], f'bytes */{len(CSS)}')
+
+    def test_if_range_mismatch_returns_whole_file(self):
+        status, _, body = self.get(
+            self.url, HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"old"')
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(len(body), len(CSS))
+
+    def test_conditional_and_head(self):
+        _, headers, _ = self.get(self.url)
+        status, _, body = self.get(
+            self.url, HTTP_IF_NONE_MATCH=headers['ETag'])
+        self.assertEqual((status, body), ('304 Not Modified', b''))
+        status, headers, body = self.get(self.url, method='HEAD')
+        self.assertEqual((status, body), ('200 OK', b''))
+        self.assertEqual(headers['Content-Length'], str(len(CSS)))
+        status, _, _ = self.get(self.url, method='POST')
+        self.assertEqual(status, '405 Method Not Allowed')
+
+    def test_media(self):
+        status, _, body = self.get(
+            '/media/posts/a.txt', HTTP_RANGE='bytes=2-')
+        self.assertEqual((status, body), ('206 Partial Content', b'23456789'))
+
+    def test_other_requests_go_to_django(self):
+        for path in ('/', '/static/css/missing.css',
+                     '/media/../source/css/site.css', '/media/posts/'):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path)[2], b'django')
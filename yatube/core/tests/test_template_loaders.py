@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import Context, Engine
+from django.test import SimpleTestCase
+
+TEMPLATES = {
+    'feed.html': (
+        '{% for item in items %}'
+        "{% include 'card.html' %}"
+        '{% if not forloop.last %},{% endif %}'
+        '{% endfor %}'
+    ),
+    'card.html': "[{{ item }}{% include 'badge.html' with mark='!' %}]",
+    'badge.html': '{{ mark }}',
+    'only.html': "{% include 'badge.html' with mark='?' only %}",
+    'loop.html': "<{% include 'loop.html' %}>",
+    'blocks.html': "{% include 'block.html' %}",
+    'block.html': '{% block body %}тело{% endblock %}',
+}
+
+
+def engine(inline):
+    loaders = [('django.template.loaders.locmem.Loader', TEMPLATES)]
+    if inline:
+        loaders = [('core.template.loaders.Loader', loaders)]
+    return Engine(loaders=[('django.template.loaders.cached.Loader', loaders)])
+
+
+class InliningLoaderTests(SimpleTestCase):
+    def setUp(self):
+        self.engine = engine(inline=True)
+        self.loader = self.engine.template_loaders[0].loaders[0]
+
+    def source(self, name):
+        origin, = self.loader.get_template_sources(name)
+        return self.loader.get_contents(origin)
+
+    def test_constant_includes_inlined(self):
+        """Включения подставляются в текст, with превращается в {% with %}"""
+        self.assertEqual(
+            self.source('feed.html'),
+            "{% for item in items %}[{{ item }}{% with mark='!' %}"
+            '{{ mark }}{% endwith %}]{% if not forloop.last %},{% endif %}'
+            '{% endfor %}')
+
+    def test_same_output_as_include(self):
+        context = {'items': ['a', 'b', 'c']}
+        self.assertEqual(
+            self.engine.get_template('feed.html').render(Context(context)),
+            engine(inline=False).get_template('feed.html').render(
+                Context(context)))
+
+    def test_not_inlined(self):
+        """only, рекурсия и шаблоны с блоками остаются включениями"""
+        for name in ('only.html', 'loop.html', 'blocks.html'):
+            with self.subTest(name=name):
+                self.assertIn('{% include', self.source(name))
+
+    def test_bench_templates(self):
+        """Микробенчмарк выводит все режимы, разметка в них совпадает"""
+        out, err = StringIO(), StringIO()
+        call_command('bench_templates', renders=2, stdout=out, stderr=err)
+        for mode in ('debug', 'cached', 'inlined'):
+            self.assertIn(mode, out.getvalue())
+        self.assertEqual(err.getvalue(), '')
@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render
 
+from .performance import registry
+
 
 def page_not_found(request, exception):
     # Переменная exception содержит отладочную информацию,
@@ -9,3 +13,19 @@ def page_not_found(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def metrics(request):
+    """Метрики процесса в текстовом формате Prometheus.
+
+    Без METRICS_TOKEN открыты только при DEBUG.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        allowed = settings.DEBUG
+    else:
+        allowed = request.META.get('HTTP_AUTHORIZATION') == f'Bearer {token}'
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4')
@@ -1,6 +1,9 @@
 from django.contrib import admin
+from . import search
 from .models import Comment, Post, Group
 
+SEARCH_LIMIT = 1000
+
 
 class PostAdmin(admin.ModelAdmin):
     list_display = (
@@ -15,6 +18,16 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Вместо LIKE по всей таблице — обратный индекс, если он есть.
+        if not search_term:
+            return queryset, False
+        post_ids = search.post_ids(search_term, SEARCH_LIMIT)
+        if post_ids is None:
+            return super().get_search_results(
+                request, queryset, search_term)
+        return queryset.filter(pk__in=post_ids), False
+
 
 class CommentAdmin(admin.ModelAdmin):
     list_display = (
@@ -0,0 +1,133 @@
+"""Карточки авторов в кэше.
+
+Ленты и страницы постов выводят об авторе немногое: имя, username
+и счётчики. Эти поля хранятся в кэше компактным словарём по id
+пользователя, так что ленте не нужен JOIN с auth_user, а популярные
+авторы не перечитываются на каждой странице. Недостающие карточки
+дочитываются одним запросом (get_many()). Карточку сбрасывает
+сохранение пользователя и изменение его счётчиков, все сразу —
+пересчёт счётчиков (сдвиг версии области 'authors').
+
+Для шаблонов карточка превращается в экземпляр User с отложенными
+остальными полями и уже подставленным profile.
+"""
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+
+from .cache import bump, get_versions
+from .groups import RegistryGroupIterable
+from .models import Post, Profile
+
+User = get_user_model()
+
+SCOPE = 'authors'
+USER_FIELDS = ('id', 'username', 'first_name', 'last_name')
+COUNTERS = (
+    'posts_count', 'followers_count', 'following_count', 'comments_count')
+TIMEOUT = 60 * 60
+
+
+def _card_keys(user_ids):
+    generation = get_versions([SCOPE])[SCOPE]
+    return {f'card:{generation}:{pk}': pk for pk in user_ids}
+
+
+def _name_key(username):
+    return 'card-name:' + hashlib.md5(username.encode()).hexdigest()
+
+
+def _fetch(**lookup):
+    rows = User.objects.filter(**lookup).values_list(
+        *USER_FIELDS, *(f'profile__{counter}' for counter in COUNTERS))
+    return {
+        row[0]: dict(zip(USER_FIELDS + COUNTERS,
+                         row[:4] + tuple(value or 0 for value in row[4:])))
+        for row in rows
+    }
+
+
+def get_many(user_ids):
+    """Карточки пользователей user_ids: словарь id → карточка."""
+    keys = _card_keys(set(user_ids))
+    if not keys:
+        return {}
+    cards = {keys[key]: card for key, card in cache.get_many(keys).items()}
+    missing = set(keys.values()) - set(cards)
+    if missing:
+        fetched = _fetch(pk__in=missing)
+        cache.set_many({
+            key: fetched[pk] for key, pk in keys.items() if pk in fetched
+        }, TIMEOUT)
+        cards.update(fetched)
+    return cards
+
+
+def get_by_username(username):
+    """Карточка пользователя username или None."""
+    user_id = cache.get(_name_key(username))
+    if user_id is not None:
+        card = get_many([user_id]).get(user_id)
+        if card is not None and card['username'] == username:
+            return card
+    fetched = _fetch(username=username)
+    if not fetched:
+        return None
+    (user_id, card), = fetched.items()
+    cache.set(_name_key(username), user_id, TIMEOUT)
+    cache.set_many(
+        {key: card for key in _card_keys([user_id])}, TIMEOUT)
+    return card
+
+
+def as_user(card):
+    """User из карточки; поля вне карточки дочитываются при обращении."""
+    user = User.from_db(
+        'default', USER_FIELDS, [card[field] for field in USER_FIELDS])
+    profile = Profile.from_db(
+        'default', ('user_id',) + COUNTERS,
+        [card['id']] + [card[counter] for counter in COUNTERS])
+    User.profile.related.set_cached_value(user, profile)
+    Profile.user.field.set_cached_value(profile, user)
+    return user
+
+
+def get_author_or_404(username):
+    card = get_by_username(username)
+    if card is None:
+        raise Http404('Нет такого пользователя')
+    return as_user(card)
+
+
+def forget(*user_ids):
+    """Сбрасывает карточки сразу и ещё раз после фиксации транзакции."""
+    def delete():
+        cache.delete_many(list(_card_keys(user_ids)))
+
+    delete()
+    transaction.on_commit(delete)
+
+
+def forget_all():
+    bump(SCOPE)
+
+
+class AuthorCardIterable(RegistryGroupIterable):
+    """Посты с авторами из карточек и группами из реестра.
+
+    Авторы, которых нет в базе карточек, дочитываются одним запросом
+    на всю выборку.
+    """
+
+    def __iter__(self):
+        posts = list(super().__iter__())
+        cards = get_many({post.author_id for post in posts})
+        cache_author = Post.author.field.set_cached_value
+        for post in posts:
+            card = cards.get(post.author_id)
+            if card is not None:
+                cache_author(post, as_user(card))
+            yield post
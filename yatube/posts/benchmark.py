@@ -0,0 +1,126 @@
+"""Нагрузочный прогон всех адресов posts.urls.
+
+Каждый маршрут запрашивается тестовым клиентом несколько раз; для него
+записываются p50/p95 времени ответа, число SQL-запросов и пик выделенной
+памяти (tracemalloc). Результат — JSON, который можно сравнить
+с сохранённым ранее прогоном.
+"""
+import statistics
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from . import urls
+from .models import Group, Post
+from .seeding import VOCABULARY
+
+User = get_user_model()
+
+# Маршруты, которые запрашиваются не простым GET.
+REQUESTS = {
+    'add_comment': ('post', {'text': 'Комментарий из бенчмарка'}),
+    'search': ('get', {'q': VOCABULARY[0]}),
+}
+
+
+def pick_viewer():
+    """Пользователь с постами и подписками — от его имени идут запросы."""
+    return User.objects.filter(
+        posts__isnull=False, follower__isnull=False
+    ).order_by('-profile__following_count', 'pk').first()
+
+
+def routes(viewer):
+    """Адреса всех маршрутов posts.urls для данных из seeding."""
+    post = Post.objects.filter(author=viewer).first()
+    author = User.objects.exclude(pk=viewer.pk).first()
+    values = {
+        'slug': Group.objects.values_list('slug', flat=True).first(),
+        'username': author.username,
+        'post_id': post.pk,
+    }
+    result = {}
+    for pattern in urls.urlpatterns:
+        kwargs = {name: values[name] for name in pattern.pattern.converters}
+        url = reverse(f'{urls.app_name}:{pattern.name}', kwargs=kwargs)
+        method, data = REQUESTS.get(pattern.name, ('get', None))
+        result[pattern.name] = (method, url, data)
+    return result
+
+
+def percentile(timings, share):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * share))]
+
+
+class QueryCounter:
+    """Считает запросы к базе независимо от DEBUG и журнала запросов."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(client, method, url, data, repeat, cold=False):
+    """Замеры одного маршрута; cold=True очищает кэш перед запросом."""
+    timings = []
+    queries = QueryCounter()
+    with connection.execute_wrapper(queries):
+        for _ in range(repeat):
+            if cold:
+                cache.clear()
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            timings.append((time.perf_counter() - started) * 1000)
+    if cold:
+        cache.clear()
+    tracemalloc.start()
+    getattr(client, method)(url, data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'url': url,
+        'status': response.status_code,
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'queries': round(queries.count / repeat, 2),
+        'alloc_peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run(viewer, repeat=20, cold=False):
+    """Прогоняет все маршруты от имени viewer."""
+    client = Client()
+    client.force_login(viewer)
+    return {
+        name: measure(client, method, url, data, repeat, cold)
+        for name, (method, url, data) in routes(viewer).items()
+    }
+
+
+def compare(baseline, current):
+    """Строки отчёта: изменение метрик относительно baseline."""
+    lines = []
+    for name, metrics in current.items():
+        old = baseline.get(name)
+        if old is None:
+            lines.append(f'{name}: новый маршрут')
+            continue
+        changes = []
+        for metric in ('p50_ms', 'p95_ms', 'queries', 'alloc_peak_kb'):
+            before, after = old.get(metric), metrics[metric]
+            if not before:
+                changes.append(f'{metric} {after}')
+                continue
+            delta = (after - before) / before * 100
+            changes.append(f'{metric} {before} → {after} ({delta:+.0f}%)')
+        lines.append(f'{name}: ' + ', '.join(changes))
+    return lines
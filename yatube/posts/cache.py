@@ -0,0 +1,230 @@
+"""Кэш страниц, который сбрасывается записью, а не по таймеру.
+
+Каждая страница зависит от «областей» данных: 'posts' (все посты),
+'group:<slug>', 'author:<username>', 'post:<id>', 'user:<id>'. У области
+есть версия — метка времени последней записи. Вместе с ответом в кэше
+хранятся версии его областей; если хотя бы одна сдвинулась, страница
+строится заново.
+"""
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date
+
+from core.cache import get_or_set
+from core.db.routers import reading_replica
+from .models import Post
+
+
+def _version_key(scope):
+    return 'version:' + hashlib.md5(scope.encode()).hexdigest()
+
+
+def get_versions(scopes):
+    """Текущие версии областей. Отсутствующие заводятся заново."""
+    keys = {_version_key(scope): scope for scope in scopes}
+    found = cache.get_many(keys)
+    versions = {keys[key]: value for key, value in found.items()}
+    now = time.time_ns() // 1000
+    for key, scope in keys.items():
+        if key not in found:
+            cache.add(key, now, timeout=None)
+            versions[scope] = now
+    return versions
+
+
+def bump(*scopes):
+    """Сдвигает версии областей: зависящие от них страницы устаревают."""
+    now = time.time_ns() // 1000
+    cache.set_many(
+        {_version_key(scope): now for scope in scopes}, timeout=None)
+
+
+def invalidate(*scopes):
+    """Сбрасывает области сразу и ещё раз после фиксации транзакции.
+
+    Второй сброс нужен, чтобы страница, собранная по старым данным
+    до фиксации, не осталась в кэше под новой версией.
+    """
+    bump(*scopes)
+    transaction.on_commit(lambda: bump(*scopes))
+
+
+def post_scopes(post_id):
+    """Области кэша, которые показывают пост post_id."""
+    scopes = ['posts', f'post:{post_id}']
+    for username, slug in Post.objects.filter(pk=post_id).values_list(
+            'author__username', 'group__slug'):
+        scopes.append(f'author:{username}')
+        if slug:
+            scopes.append(f'group:{slug}')
+    return scopes
+
+
+def settled(versions):
+    """Последняя запись в областях уже дошла до реплик.
+
+    Реплика отстаёт не дольше REPLICA_PIN_SECONDS. Ответ, собранный
+    с неё раньше, может не содержать этой записи; в кэше или с ETag
+    он остался бы старым до следующей записи. Такой ответ отдаётся,
+    но не кэшируется и не получает валидаторов.
+    """
+    if not versions or not reading_replica():
+        return True
+    lag = settings.REPLICA_PIN_SECONDS * 1_000_000
+    return max(versions.values()) <= time.time_ns() // 1000 - lag
+
+
+def depends_on(request, *scopes):
+    """Отмечает области, от которых зависит кэшируемый ответ.
+
+    Версии читаются до выборки данных, поэтому запись, случившаяся
+    во время сборки страницы, её не «спрячет».
+    """
+    versions = getattr(request, 'cache_versions', None)
+    if versions is not None:
+        versions.update(get_versions(scopes))
+
+
+def cached_fragment(name, scopes, render):
+    """Общий для всех пользователей кусок страницы.
+
+    render() вызывается, только если кусок не в кэше или одна из
+    областей scopes сдвинулась с момента его сборки.
+    """
+    key = 'fragment:' + hashlib.md5(name.encode()).hexdigest()
+    entry = get_or_set(
+        key, lambda: (get_versions(scopes), render()),
+        settings.VIEW_CACHE_TIMEOUT,
+        is_fresh=lambda entry: get_versions(entry[0]) == entry[0],
+    )
+    return entry[1]
+
+
+def _auth_key(user_id):
+    return f'auth:{user_id}'
+
+
+def forget_auth(user_id):
+    """Забывает хеш входа пользователя: сменились пароль или активность."""
+    cache.delete(_auth_key(user_id))
+
+
+def session_user_id(request):
+    """id пользователя сессии или None, если сессия уже недействительна.
+
+    Как django.contrib.auth.get_user, сверяет хеш пароля в сессии, но
+    с хешем из кэша, а не из таблицы пользователей. В кэш хеш попадает
+    только после полной проверки через request.user (неактивный
+    пользователь её не пройдёт) и забывается при сохранении
+    пользователя.
+    """
+    user_id = request.session.get(SESSION_KEY)
+    if user_id is None:
+        return None
+    key = _auth_key(user_id)
+    expected = cache.get(key)
+    if expected is None:
+        if not request.user.is_authenticated:
+            return None
+        expected = request.user.get_session_auth_hash()
+        cache.set(key, expected, settings.VIEW_CACHE_TIMEOUT)
+    session_hash = request.session.get(HASH_SESSION_KEY, '')
+    if not constant_time_compare(session_hash, expected):
+        return None
+    return user_id
+
+
+def response_key(request):
+    """Ключ ответа: адрес, параметры, пользователь и его CSRF-секрет.
+
+    Пользователь берётся из сессии и сверяется с хешем входа из кэша,
+    без запроса к таблице пользователей: так проверка кэша и ответ 304
+    обходятся одним запросом к сессии. Старая сессия после смены
+    пароля получает страницу гостя.
+    """
+    viewer = 'anonymous'
+    user_id = session_user_id(request)
+    if user_id is not None:
+        viewer = f'{user_id}:{request.META.get("CSRF_COOKIE", "")}'
+    raw = f'{request.path}?{request.GET.urlencode()}|{viewer}'
+    return 'response:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def validators(key, versions):
+    """ETag и время изменения (в секундах) ответа key по версиям областей."""
+    raw = key + '|' + ','.join(
+        f'{scope}={version}' for scope, version in sorted(versions.items()))
+    etag = '"' + hashlib.md5(raw.encode()).hexdigest() + '"'
+    last_modified = None
+    if versions:
+        last_modified = math.ceil(max(versions.values()) / 1_000_000)
+    return etag, last_modified
+
+
+def conditional(request, response, key, versions):
+    """Проставляет ETag и Last-Modified по версиям областей страницы.
+
+    Если у клиента та же версия, вместо страницы уходит 304.
+    """
+    etag, last_modified = validators(key, versions)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=response)
+
+
+def cache_response(view):
+    """Кэширует GET-ответ представления до изменения его областей.
+
+    Ответ несёт ETag и Last-Modified; на повторный условный запрос
+    при неизменных областях отдаётся 304 без сборки страницы.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return view(request, *args, **kwargs)
+        rendered = []
+
+        def build():
+            request.cache_versions = {}
+            response = view(request, *args, **kwargs)
+            rendered.append(response)
+            if response.status_code != 200 or response.streaming:
+                return None
+            if not settled(request.cache_versions):
+                return None
+            return (
+                request.cache_versions,
+                response.status_code,
+                list(response.items()),
+                response.content,
+            )
+
+        key = response_key(request)
+        entry = get_or_set(
+            key, build, settings.VIEW_CACHE_TIMEOUT,
+            is_fresh=lambda entry: get_versions(entry[0]) == entry[0],
+        )
+        if rendered:
+            response = rendered[0]
+        else:
+            versions, status, headers, content = entry
+            response = HttpResponse(content, status=status)
+            for header, value in headers:
+                response[header] = value
+        if entry is None:
+            return response
+        return conditional(request, response, key, entry[0])
+    return wrapper
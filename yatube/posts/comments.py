@@ -0,0 +1,37 @@
+"""Комментарии к посту порциями по курсору (created, id).
+
+Первая порция выводится на странице поста из общего для всех
+пользователей кэша, более старые догружаются по запросу.
+"""
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from .cache import cached_fragment
+from .models import Comment
+from .utils import CursorPaginator
+
+COMMENT_FIELDS = ('text', 'created', 'post', 'author', 'author__username')
+
+
+def comments_page(post_id, after=None):
+    """Страница комментариев поста: от новых к старым после курсора."""
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author').only(*COMMENT_FIELDS)
+    pages = CursorPaginator(
+        comments, settings.COMMENTS_MAX, date_field='created')
+    return pages.cursor_page(after=after)
+
+
+def render_comments(post_id, after=None):
+    return render_to_string('posts/includes/comments.html', {
+        'page_obj': comments_page(post_id, after),
+        'post_id': post_id,
+    })
+
+
+def first_comments(post_id):
+    """Разметка первой порции; сбрасывается с областью поста."""
+    return cached_fragment(
+        f'comments:{post_id}', [f'post:{post_id}'],
+        lambda: render_comments(post_id),
+    )
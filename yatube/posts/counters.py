@@ -0,0 +1,57 @@
+"""Денормализованные счётчики постов, подписчиков и комментариев.
+
+Счётчики меняются атомарным UPDATE ... SET x = x + 1 в обработчиках
+сигналов, поэтому страницы читают их без COUNT(*). Полный пересчёт
+выполняет recount() (команда ``manage.py recount_counters``).
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .authors import forget, forget_all
+from .models import Comment, Follow, Post, Profile
+
+User = get_user_model()
+
+PROFILE_COUNTERS = {
+    'posts_count': (Post, 'author'),
+    'followers_count': (Follow, 'author'),
+    'following_count': (Follow, 'user'),
+    'comments_count': (Comment, 'author'),
+}
+
+
+def bump(model, pk, field, delta):
+    """Сдвигает счётчик field у записи pk на delta."""
+    if pk is not None:
+        model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+
+
+def bump_profile(user_id, field, delta):
+    bump(Profile, user_id, field, delta)
+    if user_id is not None:
+        forget(user_id)
+
+
+def _count(model, field, outer):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef(outer)})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    ), 0)
+
+
+def recount():
+    """Пересчитывает все счётчики по данным таблиц."""
+    missing = User.objects.filter(profile__isnull=True).values_list(
+        'pk', flat=True)
+    Profile.objects.bulk_create(
+        [Profile(user_id=pk) for pk in missing])
+    Profile.objects.update(**{
+        counter: _count(model, field, 'user')
+        for counter, (model, field) in PROFILE_COUNTERS.items()
+    })
+    Post.objects.update(comments_count=_count(Comment, 'post', 'pk'))
+    forget_all()
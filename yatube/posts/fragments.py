@@ -0,0 +1,65 @@
+"""Кэш отрисованных карточек постов («матрёшка» внутри кэша страниц).
+
+Одна и та же карточка поста выводится на главной, в профиле, в группе
+и в ленте подписок. Разметка карточки кэшируется под ключом из id поста
+и версий того, что она показывает: самого поста ('post:<id>' сдвигается
+правкой и комментариями), автора ('user:<id>' — сохранением
+пользователя) и групп ('groups'). Карточки страницы читаются одним
+cache.get_many, отрисовываются только недостающие — тем же движком,
+что и страница, но сырыми шаблонами: время карточек уже входит во
+время шаблона страницы и второй раз в метрики не попадает.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template import Context, Engine
+
+from core import performance
+from .cache import get_versions
+
+
+def _scopes(post):
+    return f'post:{post.pk}', f'user:{post.author_id}'
+
+
+def _renderer(engine, template_name):
+    """Функция рендера шаблона движка engine без учёта в метриках."""
+    template = engine.get_template(template_name)
+    if isinstance(engine, Engine):
+        return lambda context: template.render(
+            Context(context, autoescape=engine.autoescape))
+    return template.render
+
+
+def render_cards(posts, template_name, engine=None, **extra):
+    """Разметка карточек posts шаблоном template_name: id поста → HTML.
+
+    engine — движок страницы: django.template.Engine (по умолчанию
+    первый из TEMPLATES) или окружение Jinja2. extra — постоянные для
+    страницы переменные шаблона, входят в ключ.
+    """
+    engine = engine or Engine.get_default()
+    posts = list(posts)
+    versions = get_versions(
+        {scope for post in posts for scope in _scopes(post)} | {'groups'})
+    prefix = (f'{type(engine).__module__.split(".")[0]}|{template_name}|'
+              f'{sorted(extra.items())}|{versions["groups"]}')
+    keys = {}
+    for post in posts:
+        raw = prefix + '|' + '|'.join(
+            f'{scope}={versions[scope]}' for scope in _scopes(post))
+        keys['post-card:' + hashlib.md5(raw.encode()).hexdigest()] = post
+    found = cache.get_many(keys)
+    cards = {keys[key].pk: html for key, html in found.items()}
+    rendered = {}
+    render = _renderer(engine, template_name)
+    for key, post in keys.items():
+        hit = key in found
+        performance.record_cache(hit)
+        if not hit:
+            html = render({'post': post, **extra})
+            rendered[key] = cards[post.pk] = html
+    if rendered:
+        cache.set_many(rendered, settings.VIEW_CACHE_TIMEOUT)
+    return cards
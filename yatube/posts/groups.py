@@ -0,0 +1,76 @@
+"""Группы в памяти процесса.
+
+Групп немного и меняются они редко, поэтому каждый воркер держит их все
+в словарях по id и по slug и не ходит за ними в базу. Общая для воркеров
+версия лежит в кэше в области 'groups': запись группы сдвигает её
+сигналом, и воркер, заметив новую версию, перечитывает группы одним
+запросом. Версия проверяется один раз на выборку, а не на каждый пост.
+"""
+import threading
+
+from django.db.models.query import ModelIterable
+from django.http import Http404
+
+from .cache import get_versions
+from .models import Group, Post
+
+SCOPE = 'groups'
+
+
+class GroupRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.version = None
+        self.by_id = {}
+        self.by_slug = {}
+
+    def current(self):
+        """Словарь групп по id, перечитанный, если версия сдвинулась."""
+        version = get_versions([SCOPE])[SCOPE]
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    groups = list(Group.objects.all())
+                    self.by_id = {group.pk: group for group in groups}
+                    self.by_slug = {group.slug: group for group in groups}
+                    self.version = version
+        return self.by_id
+
+    def get(self, pk):
+        return self.current().get(pk)
+
+    def get_by_slug(self, slug):
+        self.current()
+        return self.by_slug.get(slug)
+
+
+registry = GroupRegistry()
+
+
+def get_group_or_404(slug):
+    group = registry.get_by_slug(slug)
+    if group is None:
+        raise Http404('Нет такой группы')
+    return group
+
+
+class RegistryGroupIterable(ModelIterable):
+    """Подставляет постам группы из реестра вместо JOIN с posts_group.
+
+    Группу, которой в реестре ещё нет, Django дочитает сам при обращении.
+    """
+
+    def __iter__(self):
+        groups = None
+        cache_group = Post.group.field.set_cached_value
+        for post in super().__iter__():
+            if post.group_id is not None:
+                if groups is None:
+                    groups = registry.current()
+                group = groups.get(post.group_id)
+                if group is not None:
+                    cache_group(post, group)
+            yield post
@@ -0,0 +1,99 @@
+import itertools
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import search
+
+VOCABULARY = 50000
+WORDS_PER_POST = 30
+
+
+def percentile(timings, share):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * share))]
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает поиск по индексу FTS5 с LIKE на отдельной '
+            'синтетической базе SQLite.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--path', help='Файл базы; по умолчанию временный.')
+
+    def corpus(self, count, rng):
+        # Частоты слов убывают по закону Ципфа, как в живом тексте.
+        weights = list(itertools.accumulate(
+            1 / rank for rank in range(1, VOCABULARY + 1)))
+        words = [f'слово{rank}' for rank in range(VOCABULARY)]
+        for post_id in range(1, count + 1):
+            text = ' '.join(rng.choices(
+                words, cum_weights=weights, k=WORDS_PER_POST))
+            yield post_id, text
+
+    def build(self, db, count, rng):
+        db.execute('CREATE TABLE posts_post '
+                   '(id INTEGER PRIMARY KEY, text TEXT NOT NULL)')
+        db.execute('CREATE TABLE posts_comment (id INTEGER PRIMARY KEY, '
+                   'text TEXT NOT NULL, post_id INTEGER NOT NULL)')
+        for statement in search.SQLITE_SCHEMA:
+            db.execute(statement)
+        db.executemany('INSERT INTO posts_post VALUES (?, ?)',
+                       self.corpus(count, rng))
+        db.execute('INSERT INTO posts_post_fts (rowid, text) '
+                   'SELECT id, text FROM posts_post')
+        db.commit()
+
+    def measure(self, db, sql, params_list):
+        timings = []
+        for params in params_list:
+            started = time.perf_counter()
+            db.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def report(self, name, timings):
+        self.stdout.write(
+            f'{name:>6}: p50 {statistics.median(timings):9.2f} мс, '
+            f'p95 {percentile(timings, 0.95):9.2f} мс')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        path = options['path']
+        if path is None:
+            handle, path = tempfile.mkstemp(suffix='.sqlite3')
+            os.close(handle)
+        try:
+            db = sqlite3.connect(path)
+            started = time.perf_counter()
+            self.build(db, options['posts'], rng)
+            self.stdout.write(
+                f'Постов: {options["posts"]}, построено за '
+                f'{time.perf_counter() - started:.1f} с')
+            words = [f'слово{rng.randrange(VOCABULARY // 10)}'
+                     for _ in range(options['queries'])]
+            engine = search.SQLiteBackend()
+            ranked = (engine.ranked_sql().replace('%s', '?')
+                      + ' ORDER BY score, post_id LIMIT ?')
+            fts = self.measure(db, ranked, [
+                [engine.match(word)] * engine.match_params + [10]
+                for word in words])
+            like = self.measure(
+                db, 'SELECT id FROM posts_post WHERE text LIKE ? '
+                    'ORDER BY id DESC LIMIT ?',
+                [[f'%{word}%', 10] for word in words])
+            self.report('FTS5', fts)
+            self.report('LIKE', like)
+            db.close()
+        finally:
+            if options['path'] is None:
+                os.remove(path)
@@ -0,0 +1,79 @@
+import json
+import platform
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    override_settings, setup_test_environment, teardown_test_environment)
+
+from posts import benchmark, seeding
+
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время ответа, число запросов и память всех адресов '
+            'posts.urls на отдельной тестовой базе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Куда записать JSON.')
+        parser.add_argument(
+            '--baseline', help='JSON прошлого прогона для сравнения.')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES=BENCHMARK_CACHES,
+                                   THUMBNAIL_ASYNC=False):
+                seeding.generate(
+                    users=options['users'], posts=options['posts'],
+                    comments=options['comments'], seed=options['seed'])
+                viewer = benchmark.pick_viewer()
+                results = benchmark.run(
+                    viewer, repeat=options['repeat'], cold=options['cold'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        report = {
+            'meta': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'options': {
+                    name: options[name] for name in (
+                        'repeat', 'users', 'posts', 'comments', 'seed',
+                        'cold')
+                },
+            },
+            'routes': results,
+        }
+        for name, metrics in results.items():
+            self.stdout.write(
+                f'{name:>18}: p50 {metrics["p50_ms"]:8.2f} мс, '
+                f'p95 {metrics["p95_ms"]:8.2f} мс, '
+                f'запросов {metrics["queries"]:6.2f}, '
+                f'память {metrics["alloc_peak_kb"]:8.1f} КБ')
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)['routes']
+            for line in benchmark.compare(baseline, results):
+                self.stdout.write(line)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
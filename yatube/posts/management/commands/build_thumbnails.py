@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Строит недостающие миниатюры картинок постов.'
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').filter(
+            thumbnail_url='').values_list('pk', 'image')
+        built = 0
+        for post_id, image_name in posts.iterator():
+            thumbnails.build(post_id, image_name)
+            built += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано постов: {built}'))
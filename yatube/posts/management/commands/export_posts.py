@@ -0,0 +1,42 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = ('Выгружает пользователей, группы, посты, комментарии и подписки '
+            'в NDJSON или CSV, не загружая таблицы в память целиком.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Файл выгрузки или - для stdout.')
+        parser.add_argument(
+            '--format', choices=('ndjson', 'csv'), default='ndjson')
+        parser.add_argument(
+            '--model', action='append', choices=list(transfer.FIELDS),
+            help='Выгружаемые модели; для CSV ровно одна.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        models = options['model'] or list(transfer.FIELDS)
+        if options['format'] == 'csv' and len(models) != 1:
+            raise CommandError('Для CSV укажите одну модель через --model')
+        records = transfer.export_records(models, options['batch_size'])
+        started = time.perf_counter()
+        file = sys.stdout
+        if options['output'] != '-':
+            file = open(options['output'], 'w', encoding='utf-8', newline='')
+        try:
+            if options['format'] == 'csv':
+                count = transfer.write_csv(records, file, models[0])
+            else:
+                count = transfer.write_ndjson(records, file)
+        finally:
+            if file is not sys.stdout:
+                file.close()
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f'Выгружено записей: {count} за {elapsed:.1f} с '
+            f'({count / max(elapsed, 1e-9):.0f} в секунду)')
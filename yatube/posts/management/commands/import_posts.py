@@ -0,0 +1,64 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = ('Загружает выгрузку export_posts порциями через bulk_create, '
+            'затем пересобирает счётчики, ленты и поисковый индекс.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='Файл выгрузки или - для stdin.')
+        parser.add_argument(
+            '--format', choices=('ndjson', 'csv'), default='ndjson')
+        parser.add_argument(
+            '--model', choices=list(transfer.FIELDS),
+            help='Модель записей CSV-файла.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--images', help='Каталог, откуда копировать картинки постов.')
+        parser.add_argument(
+            '--id-map',
+            help='CSV-файл соответствия id постов источника и базы: '
+                 'дописывается при загрузке постов, читается для '
+                 'комментариев.')
+
+    def handle(self, *args, **options):
+        if options['format'] == 'csv' and not options['model']:
+            raise CommandError('Для CSV укажите модель через --model')
+        if (options['format'] == 'csv' and options['model'] == 'comment'
+                and not options['id_map']):
+            raise CommandError(
+                'Комментарии в CSV ссылаются на id постов в источнике. '
+                'Загрузите post.csv и comment.csv с одним и тем же '
+                '--id-map или используйте NDJSON.')
+        importer = transfer.Importer(
+            batch_size=options['batch_size'], images=options['images'],
+            id_map=options['id_map'])
+        file = sys.stdin
+        if options['input'] != '-':
+            file = open(options['input'], encoding='utf-8', newline='')
+        started = time.perf_counter()
+        try:
+            if options['format'] == 'csv':
+                records = transfer.read_csv(file, options['model'])
+            else:
+                records = transfer.read_ndjson(file)
+            created = importer.load(records)
+        finally:
+            if file is not sys.stdin:
+                file.close()
+        loaded = time.perf_counter() - started
+        importer.finish()
+        total = sum(created.values())
+        for model, count in created.items():
+            self.stdout.write(f'{model}: {count}')
+        self.stdout.write(
+            f'Пропущено записей: {importer.skipped}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено записей: {total} за {loaded:.1f} с '
+            f'({total / max(loaded, 1e-9):.0f} в секунду), пересборка '
+            f'{time.perf_counter() - started - loaded:.1f} с'))
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import seeding
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, группами, '
+            'подписками, постами и комментариями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок пользователя.')
+        parser.add_argument(
+            '--alpha', type=float, default=1.2,
+            help='Показатель степенного закона популярности авторов.')
+        parser.add_argument('--images', action='store_true')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def progress(model, count):
+            self.stdout.write(
+                f'{model}: {count} '
+                f'({time.perf_counter() - started:.1f} с от начала)')
+
+        counts = seeding.generate(
+            users=options['users'], groups=options['groups'],
+            posts=options['posts'], comments=options['comments'],
+            follows=options['follows'], alpha=options['alpha'],
+            images=options['images'], seed=options['seed'],
+            batch_size=options['batch_size'], progress=progress,
+        )
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано строк: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} в секунду)'))
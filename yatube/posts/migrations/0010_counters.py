@@ -0,0 +1,57 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('posts', 'Post')
+    Profile = apps.get_model('posts', 'Profile')
+    users = User.objects.annotate(
+        total_posts=Count('posts', distinct=True),
+        total_followers=Count('following', distinct=True),
+        total_following=Count('follower', distinct=True),
+        total_comments=Count('comments', distinct=True),
+    )
+    Profile.objects.bulk_create(
+        (Profile(user_id=user.pk,
+                 posts_count=user.total_posts,
+                 followers_count=user.total_followers,
+                 following_count=user.total_following,
+                 comments_count=user.total_comments)
+         for user in users.iterator()),
+        batch_size=1000,
+    )
+    for post in Post.objects.annotate(total=Count('comments')).iterator():
+        if post.total:
+            Post.objects.filter(pk=post.pk).update(comments_count=post.total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0009_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='profile', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.IntegerField(default=0)),
+                ('followers_count', models.IntegerField(default=0)),
+                ('following_count', models.IntegerField(default=0)),
+                ('comments_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
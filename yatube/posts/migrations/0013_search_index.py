@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+from posts import search
+
+
+def create_index(apps, schema_editor):
+    backend_class = search.BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class is None:
+        return
+    try:
+        for statement in backend_class.schema:
+            schema_editor.execute(statement)
+    except OperationalError:
+        # SQLite собран без FTS5: поиск останется выключенным.
+        return
+    if backend_class is search.SQLiteBackend:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO posts_post_fts (rowid, text) '
+                'SELECT id, text FROM posts_post')
+            cursor.execute(
+                'INSERT INTO posts_comment_fts (rowid, text, post_id) '
+                'SELECT id, text, post_id FROM posts_comment '
+                'WHERE post_id IS NOT NULL')
+
+
+def drop_index(apps, schema_editor):
+    backend_class = search.BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class is not None:
+        for statement in backend_class.drop:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_thumbnail'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
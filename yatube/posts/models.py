@@ -13,6 +13,37 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    FEED_FIELDS = (
+        'text', 'pub_date', 'image', 'comments_count',
+        'thumbnail_url', 'thumbnail_width', 'thumbnail_height',
+        'author', 'group',
+    )
+
+    def feed(self):
+        """Посты для лент: автор из кэша карточек, группа из реестра,
+        только колонки, которые выводят шаблоны ленты.
+        """
+        return self.only(*self.FEED_FIELDS).with_cards()
+
+    def with_groups(self):
+        """Группы постов берутся из posts.groups.registry, без JOIN."""
+        # Импорт здесь: модуль реестра сам импортирует модели.
+        from .groups import RegistryGroupIterable
+
+        clone = self._chain()
+        clone._iterable_class = RegistryGroupIterable
+        return clone
+
+    def with_cards(self):
+        """Как with_groups(), а авторы — из posts.authors, без JOIN."""
+        from .authors import AuthorCardIterable
+
+        clone = self._chain()
+        clone._iterable_class = AuthorCardIterable
+        return clone
+
+
 class Post(models.Model):
     text = models.TextField()
     pub_date = models.DateTimeField(auto_now_add=True)
@@ -32,11 +63,31 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    comments_count = models.IntegerField(default=0, editable=False)
+    thumbnail_url = models.CharField(
+        max_length=255, blank=True, editable=False)
+    thumbnail_width = models.PositiveIntegerField(null=True, editable=False)
+    thumbnail_height = models.PositiveIntegerField(null=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -64,6 +115,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='comment_post_created_idx'
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -84,3 +141,59 @@ class Follow(models.Model):
                 fields=['user', 'author'], name='unique_author_user_following'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['author', 'user'], name='follow_author_user_idx'
+            ),
+        ]
+
+
+class Profile(models.Model):
+    """Счётчики пользователя, которые иначе пришлось бы считать COUNT(*)."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='profile'
+    )
+    posts_count = models.IntegerField(default=0)
+    followers_count = models.IntegerField(default=0)
+    following_count = models.IntegerField(default=0)
+    comments_count = models.IntegerField(default=0)
+
+
+class TimelineEntry(models.Model):
+    """Строка материализованной ленты подписок пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pub_date', '-post_id')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_timeline_user_post'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_pub_date_idx'
+            ),
+            models.Index(
+                fields=['user', 'author'], name='timeline_user_author_idx'
+            ),
+        ]
@@ -0,0 +1,251 @@
+"""Полнотекстовый поиск по постам и комментариям.
+
+В SQLite используется обратный индекс FTS5: по виртуальной таблице на
+посты и на комментарии, rowid строки совпадает с id записи. Индекс
+обновляют сигналы при сохранении и удалении. В PostgreSQL поиск идёт по
+выражению to_tsvector с GIN-индексом, который база поддерживает сама.
+Результаты ранжируются (bm25 / ts_rank), совпадение в комментарии весит
+вдвое меньше совпадения в тексте поста.
+"""
+import math
+import re
+from urllib.parse import urlencode
+
+from django.db import connection
+
+from .models import Comment, Post
+from .utils import CursorPaginator, valid_id
+
+COMMENT_WEIGHT = 0.5
+POSTGRES_CONFIG = 'russian'
+
+SQLITE_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts "
+    "USING fts5(text, tokenize='unicode61')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_comment_fts "
+    "USING fts5(text, post_id UNINDEXED, tokenize='unicode61')",
+)
+SQLITE_DROP = (
+    'DROP TABLE IF EXISTS posts_post_fts',
+    'DROP TABLE IF EXISTS posts_comment_fts',
+)
+POSTGRES_SCHEMA = (
+    f"CREATE INDEX IF NOT EXISTS posts_post_text_fts ON posts_post "
+    f"USING GIN (to_tsvector('{POSTGRES_CONFIG}', text))",
+    f"CREATE INDEX IF NOT EXISTS posts_comment_text_fts ON posts_comment "
+    f"USING GIN (to_tsvector('{POSTGRES_CONFIG}', text))",
+)
+POSTGRES_DROP = (
+    'DROP INDEX IF EXISTS posts_post_text_fts',
+    'DROP INDEX IF EXISTS posts_comment_text_fts',
+)
+
+
+def terms(query):
+    """Слова запроса без операторов языка запросов."""
+    return re.findall(r'\w+', query.lower())
+
+
+class SQLiteBackend:
+    schema = SQLITE_SCHEMA
+    drop = SQLITE_DROP
+    match_params = 2
+    keyset_clause = 'HAVING'
+
+    def match(self, query):
+        return ' '.join(f'"{term}"*' for term in terms(query))
+
+    def index_post(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM posts_post_fts WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                'INSERT INTO posts_post_fts (rowid, text) VALUES (%s, %s)',
+                [post.pk, post.text])
+
+    def remove_post(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM posts_post_fts WHERE rowid = %s', [post.pk])
+
+    def index_comment(self, comment):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM posts_comment_fts WHERE rowid = %s',
+                [comment.pk])
+            if comment.post_id:
+                cursor.execute(
+                    'INSERT INTO posts_comment_fts (rowid, text, post_id) '
+                    'VALUES (%s, %s, %s)',
+                    [comment.pk, comment.text, comment.post_id])
+
+    def remove_comment(self, comment):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM posts_comment_fts WHERE rowid = %s',
+                [comment.pk])
+
+    def reindex(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM posts_post_fts')
+            cursor.execute('DELETE FROM posts_comment_fts')
+            cursor.execute(
+                'INSERT INTO posts_post_fts (rowid, text) '
+                'SELECT id, text FROM posts_post')
+            cursor.execute(
+                'INSERT INTO posts_comment_fts (rowid, text, post_id) '
+                'SELECT id, text, post_id FROM posts_comment '
+                'WHERE post_id IS NOT NULL')
+
+    def ranked_sql(self):
+        return (
+            'SELECT post_id, MIN(score) AS score FROM ('
+            ' SELECT rowid AS post_id, bm25(posts_post_fts) AS score'
+            ' FROM posts_post_fts WHERE posts_post_fts MATCH %s'
+            ' UNION ALL'
+            f' SELECT post_id, bm25(posts_comment_fts) * {COMMENT_WEIGHT}'
+            ' FROM posts_comment_fts WHERE posts_comment_fts MATCH %s'
+            ') GROUP BY post_id'
+        )
+
+    def window(self, query, key, reverse, limit):
+        """Пары (score, post_id) за ключом key; меньший score — лучше."""
+        match = self.match(query)
+        if not match:
+            return []
+        sql = self.ranked_sql()
+        params = [match] * self.match_params
+        if key is not None:
+            op = '<' if reverse else '>'
+            sql += (f' {self.keyset_clause} (score {op} %s OR '
+                    f'(score = %s AND post_id {op} %s))')
+            params += [key[0], key[0], key[1]]
+        order = 'DESC' if reverse else 'ASC'
+        sql += f' ORDER BY score {order}, post_id {order} LIMIT %s'
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(score, post_id) for post_id, score in cursor.fetchall()]
+
+
+class PostgresBackend(SQLiteBackend):
+    schema = POSTGRES_SCHEMA
+    drop = POSTGRES_DROP
+    match_params = 4
+    keyset_clause = 'AND'
+
+    def match(self, query):
+        return ' & '.join(f'{term}:*' for term in terms(query))
+
+    def index_post(self, *args):
+        """GIN-индекс по выражению база обновляет сама."""
+
+    remove_post = index_comment = remove_comment = reindex = index_post
+
+    def ranked_sql(self):
+        document = f"to_tsvector('{POSTGRES_CONFIG}', text)"
+        query = f"to_tsquery('{POSTGRES_CONFIG}', %s)"
+        return (
+            'SELECT post_id, score FROM ('
+            ' SELECT post_id, MIN(score) AS score FROM ('
+            f'  SELECT id AS post_id, -ts_rank({document}, {query}) AS score'
+            f'  FROM posts_post WHERE {document} @@ {query}'
+            '  UNION ALL'
+            f'  SELECT post_id, -ts_rank({document}, {query})'
+            f'   * {COMMENT_WEIGHT}'
+            f'  FROM posts_comment WHERE {document} @@ {query}'
+            ' ) AS matches GROUP BY post_id'
+            ') AS ranked WHERE TRUE'
+        )
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'postgresql': PostgresBackend,
+}
+
+
+_available = {}
+
+
+def backend():
+    """Поисковый движок текущей базы или None, если его нет.
+
+    В SQLite без расширения FTS5 миграция не создаёт таблицы индекса,
+    и поиск тогда отключён.
+    """
+    backend_class = BACKENDS.get(connection.vendor)
+    if backend_class is None:
+        return None
+    name = connection.settings_dict['NAME']
+    if name not in _available:
+        _available[name] = (
+            backend_class is not SQLiteBackend
+            or 'posts_post_fts' in connection.introspection.table_names()
+        )
+    return backend_class() if _available[name] else None
+
+
+def post_ids(query, limit):
+    """id самых релевантных постов — для поиска в админке."""
+    engine = backend()
+    if engine is None:
+        return None
+    return [post_id for _, post_id in engine.window(query, None, False, limit)]
+
+
+class SearchPaginator(CursorPaginator):
+    """Курсорный вывод результатов поиска по ключу (релевантность, id)."""
+    numbered = False
+
+    def __init__(self, query, per_page):
+        super().__init__([], per_page)
+        self.query = query
+        self.extra_query = urlencode({'q': query}) + '&'
+
+    def key(self, obj):
+        return obj.search_score, obj.id
+
+    def parse_key(self, values):
+        if len(values) != 2 or not valid_id(values[1]):
+            return None
+        score = values[0]
+        if isinstance(score, bool) or not isinstance(score, (int, float)):
+            return None
+        if not math.isfinite(score):
+            return None
+        return float(score), values[1]
+
+    def fetch(self, key, reverse, limit):
+        engine = backend()
+        if engine is None:
+            return []
+        rows = engine.window(self.query, key, reverse, limit)
+        posts = Post.objects.feed().in_bulk([post_id for _, post_id in rows])
+        results = []
+        for score, post_id in rows:
+            post = posts.get(post_id)
+            if post is not None:
+                post.search_score = score
+                results.append(post)
+        return results
+
+
+def index_instance(instance):
+    engine = backend()
+    if engine is None:
+        return
+    if isinstance(instance, Comment):
+        engine.index_comment(instance)
+    else:
+        engine.index_post(instance)
+
+
+def remove_instance(instance):
+    engine = backend()
+    if engine is None:
+        return
+    if isinstance(instance, Comment):
+        engine.remove_comment(instance)
+    else:
+        engine.remove_post(instance)
@@ -0,0 +1,187 @@
+"""Синтетические данные для проверки на больших объёмах.
+
+Объёмы задаются параметрами, случайность — зерном, поэтому один и тот же
+вызов на пустой базе даёт одни и те же строки. Популярность авторов
+подчиняется степенному закону: немногие авторы собирают большую часть
+подписок, а немногие посты — большую часть комментариев. Пишут
+пользователи равномерно, иначе лента подписок популярного автора
+разрослась бы квадратично. Строки пишутся bulk_create
+порциями с заранее назначенными id, производные данные (счётчики,
+ленты, поисковый индекс) пересобираются в конце одним проходом.
+"""
+import io
+import itertools
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Comment, Follow, Group, Post
+from .transfer import keep_dates, rebuild_derived
+
+User = get_user_model()
+
+VOCABULARY = [
+    'лето', 'город', 'кофе', 'книга', 'поезд', 'море', 'друзья', 'работа',
+    'музыка', 'кино', 'дождь', 'утро', 'вечер', 'собака', 'кот', 'горы',
+    'прогулка', 'проект', 'код', 'отпуск', 'снег', 'парк', 'ужин', 'фото',
+]
+DAYS = 365
+IMAGES = 10
+
+
+def power_law_weights(count, alpha):
+    """Накопленные веса рангов 1..count с показателем alpha."""
+    return list(itertools.accumulate(
+        1 / rank ** alpha for rank in range(1, count + 1)))
+
+
+def _next_id(model):
+    return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+
+def _insert(model, objects, batch_size):
+    """bulk_create по порциям: генератор не собирается в один список."""
+    created = 0
+    objects = iter(objects)
+    while True:
+        batch = list(itertools.islice(objects, batch_size))
+        if not batch:
+            return created
+        with transaction.atomic():
+            # Размер одного INSERT Django подбирает сам: у SQLite есть
+            # предел числа параметров и слагаемых составного SELECT.
+            model.objects.bulk_create(batch)
+        created += len(batch)
+
+
+def _images(rng):
+    """Несколько картинок, которые посты делят между собой."""
+    from PIL import Image
+
+    names = []
+    for number in range(IMAGES):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        buffer = io.BytesIO()
+        Image.new('RGB', (960, 540), color).save(buffer, 'JPEG')
+        names.append(default_storage.save(
+            f'posts/seed-{number}.jpg', ContentFile(buffer.getvalue())))
+    return names
+
+
+def _text(rng, words):
+    return ' '.join(rng.choices(VOCABULARY, k=words)).capitalize()
+
+
+def _follow_rows(rng, user_ids, popular, weights, follows):
+    """Подписки: число — по экспоненте, авторы — по популярности."""
+    for user_id in user_ids:
+        wanted = min(len(user_ids) - 1, int(rng.expovariate(1 / follows)))
+        authors = set()
+        for author_id in rng.choices(
+                popular, cum_weights=weights, k=wanted * 2):
+            if author_id != user_id:
+                authors.add(author_id)
+            if len(authors) >= wanted:
+                break
+        for author_id in authors:
+            yield Follow(user_id=user_id, author_id=author_id)
+
+
+def _post_rows(rng, first_post, ages, user_ids, group_ids, image_names,
+               now):
+    for pk, age in zip(itertools.count(first_post), ages):
+        group_id = None
+        if group_ids and rng.random() < 0.7:
+            group_id = rng.choice(group_ids)
+        image = ''
+        if image_names and rng.random() < 0.2:
+            image = rng.choice(image_names)
+        yield Post(
+            id=pk,
+            text=_text(rng, rng.randint(5, 60)),
+            pub_date=now - timedelta(seconds=age),
+            author_id=rng.choice(user_ids),
+            group_id=group_id,
+            image=image,
+        )
+
+
+def _comment_rows(rng, comments, first_post, ages, post_weights,
+                  user_ids, now):
+    """Комментарии: посты выбираются по популярности, пишутся позже них."""
+    if not ages:
+        return
+    for _ in range(comments):
+        index = rng.choices(range(len(ages)), cum_weights=post_weights)[0]
+        yield Comment(
+            post_id=first_post + index,
+            author_id=rng.choice(user_ids),
+            text=_text(rng, rng.randint(3, 20)),
+            created=now - timedelta(seconds=rng.uniform(0, ages[index])),
+        )
+
+
+def generate(users=1000, groups=20, posts=10000, comments=20000,
+             follows=20, alpha=1.2, images=False, seed=1,
+             batch_size=5000, progress=None):
+    """Создаёт данные и возвращает число строк по моделям.
+
+    follows — среднее число подписок пользователя, alpha — показатель
+    степенного закона популярности авторов.
+    """
+    rng = random.Random(seed)
+    report = progress or (lambda model, count: None)
+    now = timezone.now()
+    counts = {}
+
+    first_user = _next_id(User)
+    user_ids = list(range(first_user, first_user + users))
+    counts['user'] = _insert(User, (
+        User(id=pk, username=f'seed{pk}', first_name='Имя',
+             last_name=f'Фамилия {pk}', password='!')
+        for pk in user_ids), batch_size)
+    report('user', counts['user'])
+
+    first_group = _next_id(Group)
+    group_ids = list(range(first_group, first_group + groups))
+    counts['group'] = _insert(Group, (
+        Group(id=pk, title=f'Группа {pk}', slug=f'seed-{pk}',
+              description=_text(rng, 10))
+        for pk in group_ids), batch_size)
+    report('group', counts['group'])
+
+    # Авторы, упорядоченные по популярности: первый — самый читаемый.
+    popular = user_ids[:]
+    rng.shuffle(popular)
+    weights = power_law_weights(len(popular), alpha)
+    counts['follow'] = _insert(Follow, _follow_rows(
+        rng, user_ids, popular, weights, follows), batch_size)
+    report('follow', counts['follow'])
+
+    image_names = _images(rng) if images else []
+    first_post = _next_id(Post)
+    post_weights = power_law_weights(posts, alpha)
+
+    # Возраст каждого поста в секундах: комментарии пишутся позже поста.
+    ages = [rng.uniform(0, DAYS * 86400) for _ in range(posts)]
+
+    with keep_dates():
+        counts['post'] = _insert(Post, _post_rows(
+            rng, first_post, ages, user_ids, group_ids, image_names, now),
+            batch_size)
+    report('post', counts['post'])
+
+    with keep_dates():
+        counts['comment'] = _insert(Comment, _comment_rows(
+            rng, comments, first_post, ages, post_weights, user_ids, now),
+            batch_size)
+    report('comment', counts['comment'])
+
+    rebuild_derived()
+    return counts
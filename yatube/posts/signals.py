@@ -0,0 +1,172 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import search, timeline
+from .authors import forget
+from .cache import forget_auth, invalidate, post_scopes
+from .counters import bump, bump_profile
+from .models import Comment, Follow, Group, Post, Profile
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Profile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        bump_profile(instance.author_id, 'posts_count', 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    bump_profile(instance.author_id, 'posts_count', -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follow(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        bump_profile(instance.author_id, 'followers_count', 1)
+        bump_profile(instance.user_id, 'following_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    bump_profile(instance.author_id, 'followers_count', -1)
+    bump_profile(instance.user_id, 'following_count', -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        bump(Post, instance.post_id, 'comments_count', 1)
+        bump_profile(instance.author_id, 'comments_count', 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    bump(Post, instance.post_id, 'comments_count', -1)
+    bump_profile(instance.author_id, 'comments_count', -1)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created:
+        timeline.backfill(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def prune_timeline(sender, instance, **kwargs):
+    timeline.prune(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def index_for_search(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_instance(instance)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def remove_from_search(sender, instance, **kwargs):
+    search.remove_instance(instance)
+
+
+@receiver(pre_save, sender=Post)
+def invalidate_previous_post(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        invalidate(*post_scopes(instance.pk))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    scopes = ['posts', f'post:{instance.pk}',
+              f'author:{instance.author.username}']
+    if instance.group_id:
+        scopes.append(f'group:{instance.group.slug}')
+    invalidate(*scopes)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    if instance.post_id:
+        invalidate(*post_scopes(instance.post_id))
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow(sender, instance, **kwargs):
+    # Меняются счётчики обоих: подписчики автора и подписки читателя.
+    invalidate(f'author:{instance.author.username}',
+               f'author:{instance.user.username}')
+
+
+@receiver(pre_save, sender=Group)
+def invalidate_previous_group(sender, instance, raw=False, **kwargs):
+    # Страницы со ссылками на старый slug иначе жили бы до таймаута:
+    # лента группы и профили авторов её постов.
+    if instance.pk and not raw:
+        for slug in Group.objects.filter(
+                pk=instance.pk).values_list('slug', flat=True):
+            if slug != instance.slug:
+                usernames = Post.objects.filter(
+                    group_id=instance.pk
+                ).values_list('author__username', flat=True).distinct()
+                invalidate(f'group:{slug}',
+                           *(f'author:{name}' for name in usernames))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group(sender, instance, **kwargs):
+    invalidate('posts', 'groups', f'group:{instance.slug}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_session_hash(sender, instance, **kwargs):
+    # Новый пароль или is_active: кэшированные страницы старых сессий
+    # больше не отдаются.
+    forget_auth(instance.pk)
+    transaction.on_commit(lambda: forget_auth(instance.pk))
+
+
+@receiver(pre_save, sender=User)
+def invalidate_previous_username(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        for username in User.objects.filter(
+                pk=instance.pk).values_list('username', flat=True):
+            if username != instance.username:
+                invalidate(f'author:{username}')
+
+
+@receiver(post_save, sender=User)
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login', 'password'}:
+        return
+    forget(instance.pk)
+    slugs = Post.objects.filter(
+        author=instance, group__isnull=False
+    ).values_list('group__slug', flat=True).distinct()
+    invalidate('posts', f'author:{instance.username}', f'user:{instance.pk}',
+               *(f'group:{slug}' for slug in slugs))
+
+
+@receiver(post_delete, sender=User)
+def forget_user(sender, instance, **kwargs):
+    forget(instance.pk)
@@ -0,0 +1,23 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from posts.fragments import render_cards
+
+register = template.Library()
+
+ARTICLE = 'posts/includes/article.html'
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post, posts, template_name=ARTICLE, **extra):
+    """Карточка поста из кэша; карточки всей страницы posts читаются
+    одним запросом к кэшу при выводе первой из них.
+    """
+    key = ('post_cards', id(posts), template_name, tuple(sorted(extra)))
+    cards = context.render_context.get(key)
+    if cards is None or post.pk not in cards:
+        cards = render_cards(
+            posts if cards is None else [post], template_name,
+            engine=context.template.engine, **extra)
+        context.render_context[key] = cards
+    return mark_safe(cards[post.pk])
@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import authors
+from posts.counters import recount
+from posts.models import Follow, Post, Profile
+from posts.tests.shortcuts import post_create
+
+User = get_user_model()
+
+
+class AuthorCardTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', first_name='Имя', last_name='Фамилия')
+        cls.reader = User.objects.create_user(username='reader')
+        for i in range(3):
+            post_create(f'Пост {i}', cls.author, None)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feed_authors_come_from_cards(self):
+        """Лента с прогретыми карточками не обращается к auth_user"""
+        authors.get_many([self.author.pk])
+        with self.assertNumQueries(1) as context:
+            posts = list(Post.objects.feed())
+            names = {post.author.get_full_name() for post in posts}
+            counts = {post.author.profile.posts_count for post in posts}
+        self.assertNotIn('auth_user', context.captured_queries[0]['sql'])
+        self.assertEqual(names, {'Имя Фамилия'})
+        self.assertEqual(counts, {3})
+        self.assertEqual(posts[0].author, self.author)
+
+    def test_missing_cards_fetched_in_one_query(self):
+        """Недостающие карточки дочитываются одним запросом"""
+        with self.assertNumQueries(1):
+            cards = authors.get_many([self.author.pk, self.reader.pk])
+        self.assertEqual(cards[self.reader.pk]['username'], 'reader')
+        with self.assertNumQueries(0):
+            authors.get_many([self.author.pk, self.reader.pk])
+
+    def test_profile_page_uses_card(self):
+        """Профиль с прогретой карточкой — один запрос ленты"""
+        authors.get_by_username('author')
+        with self.assertNumQueries(1):
+            response = self.guest_client.get(
+                reverse('posts:profile', kwargs={'username': 'author'}))
+        self.assertEqual(response.context['author'], self.author)
+        self.assertEqual(
+            response.context['author'].profile.posts_count, 3)
+
+    def test_counter_change_forgets_card(self):
+        """Новая подписка сбрасывает карточку автора"""
+        authors.get_many([self.author.pk])
+        Follow.objects.create(user=self.reader, author=self.author)
+        card = authors.get_many([self.author.pk])[self.author.pk]
+        self.assertEqual(card['followers_count'], 1)
+
+    def test_user_save_forgets_card(self):
+        """Сохранение пользователя сбрасывает карточку"""
+        authors.get_many([self.author.pk])
+        user = User.objects.get(pk=self.author.pk)
+        user.first_name = 'Другое'
+        user.save()
+        card = authors.get_many([self.author.pk])[self.author.pk]
+        self.assertEqual(card['first_name'], 'Другое')
+
+    def test_recount_forgets_all_cards(self):
+        """Пересчёт счётчиков сбрасывает все карточки"""
+        authors.get_many([self.author.pk])
+        Profile.objects.filter(pk=self.author.pk).update(posts_count=0)
+        recount()
+        card = authors.get_many([self.author.pk])[self.author.pk]
+        self.assertEqual(card['posts_count'], 3)
+
+    def test_unknown_username_is_404(self):
+        response = self.guest_client.get(
+            reverse('posts:profile', kwargs={'username': 'missing'}))
+        self.assertEqual(response.status_code, 404)
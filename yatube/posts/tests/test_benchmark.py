@@ -0,0 +1,33 @@
+from django.test import TestCase, override_settings
+
+from posts import benchmark, seeding, urls
+
+
+@override_settings(THUMBNAIL_ASYNC=False)
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        seeding.generate(users=6, groups=2, posts=20, comments=10, follows=3)
+        cls.viewer = benchmark.pick_viewer()
+
+    def test_every_route_is_measured(self):
+        """Бенчмарк обходит все адреса posts.urls без ошибок"""
+        results = benchmark.run(self.viewer, repeat=2)
+        self.assertEqual(
+            set(results), {pattern.name for pattern in urls.urlpatterns})
+        for name, metrics in results.items():
+            with self.subTest(name=name):
+                self.assertLess(metrics['status'], 400)
+                self.assertLessEqual(metrics['p50_ms'], metrics['p95_ms'])
+                self.assertGreater(metrics['alloc_peak_kb'], 0)
+
+    def test_compare_reports_change(self):
+        """Сравнение с прошлым прогоном показывает изменение в процентах"""
+        baseline = {'index': {
+            'p50_ms': 10, 'p95_ms': 20, 'queries': 2, 'alloc_peak_kb': 100}}
+        current = {'index': {
+            'p50_ms': 5, 'p95_ms': 20, 'queries': 1, 'alloc_peak_kb': 100}}
+        self.assertEqual(benchmark.compare(baseline, current), [
+            'index: p50_ms 10 → 5 (-50%), p95_ms 20 → 20 (+0%), '
+            'queries 2 → 1 (-50%), alloc_peak_kb 100 → 100 (+0%)'])
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.templatetags.static import static
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment
+from posts.tests.shortcuts import group_create, post_create
+
+User = get_user_model()
+
+
+@override_settings(COMMENTS_MAX=2)
+class CommentThreadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = post_create(
+            'Пост', cls.author, group_create('Группа', 'Описание'))
+        for i in range(5):
+            commenter = User.objects.create_user(username=f'reader{i}')
+            Comment.objects.create(
+                post=cls.post, author=commenter, text=f'Комментарий {i}')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk})
+        self.comments_url = reverse(
+            'posts:post_comments', kwargs={'post_id': self.post.pk})
+
+    def test_post_detail_shows_first_page(self):
+        """На странице поста только первая порция новых комментариев"""
+        response = self.guest_client.get(self.detail_url)
+        self.assertContains(response, 'Комментарий 4')
+        self.assertContains(response, 'Комментарий 3')
+        self.assertNotContains(response, 'Комментарий 2')
+        self.assertContains(response, f'{self.comments_url}?after=')
+
+    def test_json_endpoint_pages_through_thread(self):
+        """JSON-адрес отдаёт комментарии порциями до конца ветки"""
+        texts, after = [], ''
+        while True:
+            data = self.guest_client.get(
+                self.comments_url, {'format': 'json', 'after': after}).json()
+            texts += [comment['text'] for comment in data['comments']]
+            if not data['next']:
+                break
+            after = data['next']
+        self.assertEqual(texts, [f'Комментарий {i}' for i in range(4, -1, -1)])
+
+    def test_htmx_gets_fragment(self):
+        """Запрос HTMX получает фрагмент без обвязки страницы"""
+        response = self.guest_client.get(
+            self.comments_url, HTTP_HX_REQUEST='true')
+        self.assertContains(response, 'Комментарий 4')
+        self.assertNotContains(response, '<html')
+
+    def test_htmx_served_from_static(self):
+        """HTMX отдаётся из своей статики, а не со стороннего CDN"""
+        response = self.guest_client.get(self.detail_url)
+        self.assertContains(response, static('js/htmx.min.js'))
+        self.assertNotContains(response, 'unpkg.com')
+
+    def test_block_is_shared_and_invalidated(self):
+        """Блок комментариев общий для всех и сбрасывается новым"""
+        self.guest_client.get(self.detail_url)
+        reader = Client()
+        reader.force_login(self.author)
+        with self.assertNumQueries(3):
+            reader.get(self.detail_url)
+        reader.post(reverse('posts:add_comment',
+                            kwargs={'post_id': self.post.pk}),
+                    {'text': 'Свежий комментарий'})
+        self.assertContains(
+            self.guest_client.get(self.detail_url), 'Свежий комментарий')
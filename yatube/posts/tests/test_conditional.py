@@ -0,0 +1,101 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.tests.shortcuts import group_create, post_create
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = group_create('Группа', 'Описание')
+        cls.post = post_create('Пост', cls.author, cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'slug'}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+
+    def test_repeat_visit_gets_not_modified(self):
+        """Повторный условный запрос получает 304 без запросов к базе"""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+                with self.assertNumQueries(0):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_authorized_not_modified_costs_one_query(self):
+        """Для пользователя 304 обходится одним запросом к сессии"""
+        url = reverse('posts:index')
+        etag = self.author_client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_changes_etag(self):
+        """После записи ETag меняется и страница отдаётся целиком"""
+        url = reverse('posts:index')
+        etag = self.guest_client.get(url)['ETag']
+        post_create('Новый пост', self.author, self.group)
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'Новый пост')
+
+    def test_etag_differs_between_viewers(self):
+        """Гость и пользователь получают разные ETag одной страницы"""
+        url = reverse('posts:index')
+        self.assertNotEqual(self.guest_client.get(url)['ETag'],
+                            self.author_client.get(url)['ETag'])
+
+    def test_old_session_loses_cached_page(self):
+        """После смены пароля или блокировки старая сессия — гость"""
+        url = reverse('posts:index')
+        create = reverse('posts:post_create')
+        for change in ('password', 'is_active'):
+            with self.subTest(change=change):
+                author = User.objects.get(pk=self.author.pk)
+                client = Client()
+                client.force_login(author)
+                self.assertContains(client.get(url), create)
+                if change == 'password':
+                    author.set_password('new-password')
+                else:
+                    author.is_active = False
+                author.save(update_fields=[change])
+                self.assertNotContains(client.get(url), create)
+                author.is_active = True
+                author.save()
+
+    def test_fresh_replica_read_is_not_cached(self):
+        """Страница с реплики сразу после записи не кэшируется"""
+        urls = self.urls + (reverse('api:posts'),)
+        with mock.patch('posts.cache.reading_replica', return_value=True):
+            for url in urls:
+                with self.subTest(url=url):
+                    cache.clear()
+                    response = self.guest_client.get(url)
+                    self.assertFalse(response.has_header('ETag'))
+                    with override_settings(REPLICA_PIN_SECONDS=0):
+                        response = self.guest_client.get(url)
+                    self.assertTrue(response.has_header('ETag'))
+                    if url in self.urls:
+                        # Страница собрана заново, а не взята из кэша.
+                        self.assertTrue(response.templates)
@@ -0,0 +1,58 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Post, Profile
+from posts.tests.shortcuts import group_create, post_create
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = group_create('Группа', 'Описание')
+
+    def profile(self, user):
+        return Profile.objects.get(user=user)
+
+    def test_counters_follow_writes(self):
+        """Счётчики меняются при создании и удалении записей"""
+        post = post_create('Пост', self.author, self.group)
+        Follow.objects.create(user=self.reader, author=self.author)
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Комментарий')
+        post.refresh_from_db()
+        self.assertEqual(self.profile(self.author).posts_count, 1)
+        self.assertEqual(self.profile(self.author).followers_count, 1)
+        self.assertEqual(self.profile(self.reader).following_count, 1)
+        self.assertEqual(self.profile(self.reader).comments_count, 1)
+        self.assertEqual(post.comments_count, 1)
+
+        comment.delete()
+        Follow.objects.filter(user=self.reader).delete()
+        post.delete()
+        self.assertEqual(self.profile(self.author).posts_count, 0)
+        self.assertEqual(self.profile(self.author).followers_count, 0)
+        self.assertEqual(self.profile(self.reader).following_count, 0)
+        self.assertEqual(self.profile(self.reader).comments_count, 0)
+
+    def test_recount_restores_counters(self):
+        """recount_counters пересчитывает счётчики по таблицам"""
+        post = post_create('Пост', self.author, self.group)
+        Comment.objects.create(post=post, author=self.reader, text='Текст')
+        Profile.objects.update(posts_count=100, comments_count=100)
+        Post.objects.update(comments_count=100)
+        Profile.objects.filter(user=self.reader).delete()
+
+        call_command('recount_counters', stdout=StringIO())
+
+        post.refresh_from_db()
+        self.assertEqual(self.profile(self.author).posts_count, 1)
+        self.assertEqual(self.profile(self.reader).comments_count, 1)
+        self.assertEqual(post.comments_count, 1)
@@ -23,6 +23,14 @@ class PostFormTests(TestCase):
         cls.group = group_create('Группа', 'Описание')
         cls.post = post_create('Пост', cls.user, cls.group)
         cls.form = PostForm
+        cls.small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
 
     def setUp(self):
         self.authorized_client = Client()
@@ -67,6 +75,26 @@ class PostFormTests(TestCase):
             image=post.image,
         ).exists())
 
+    @override_settings(THUMBNAIL_ASYNC=False)
+    def test_create_post_builds_thumbnail(self):
+        """Миниатюра картинки сохраняется в посте при создании"""
+        uploaded = SimpleUploadedFile(
+            name='thumb.gif',
+            content=self.small_gif,
+            content_type='image/gif'
+        )
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Пост с картинкой', 'image': uploaded},
+        )
+        post = Post.objects.get(text='Пост с картинкой')
+        self.assertTrue(post.thumbnail_url)
+        self.assertEqual(
+            (post.thumbnail_width, post.thumbnail_height), (960, 339))
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', args=(post.id,)))
+        self.assertContains(response, post.thumbnail_url)
+
     def test_edit_post(self):
         """Происходит изменение поста с post_id в базе данных"""
         posts_count = Post.objects.count()
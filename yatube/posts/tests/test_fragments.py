@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.cache import bump
+from posts.fragments import render_cards
+from posts.models import Post
+from posts.tests.shortcuts import group_create, post_create
+
+User = get_user_model()
+
+ARTICLE = 'posts/includes/article.html'
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', first_name='Имя', last_name='Фамилия')
+        cls.group = group_create('Группа', 'Описание')
+        for i in range(3):
+            post_create(f'Пост {i}', cls.author, cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def cards(self):
+        return render_cards(Post.objects.feed(), ARTICLE)
+
+    def test_cards_come_from_cache(self):
+        """Повторно карточки не рисуются, а берутся из кэша"""
+        first = self.cards()
+        Post.objects.update(text='Изменено без сигналов')
+        self.assertEqual(self.cards(), first)
+
+    def test_edit_invalidates_only_its_card(self):
+        """Правка поста сбрасывает только его карточку"""
+        first = self.cards()
+        Post.objects.update(text='Изменено без сигналов')
+        post = Post.objects.order_by('pk').first()
+        post.text = 'Новый текст'
+        post.save()
+        cards = self.cards()
+        self.assertIn('Новый текст', cards[post.pk])
+        for pk, html in cards.items():
+            if pk != post.pk:
+                self.assertEqual(html, first[pk])
+
+    def test_author_save_invalidates_cards(self):
+        self.cards()
+        author = User.objects.get(pk=self.author.pk)
+        author.first_name = 'Другое'
+        author.save()
+        for html in self.cards().values():
+            self.assertIn('Другое Фамилия', html)
+
+    def test_page_reads_cards_with_one_get_many(self):
+        """Страница читает все карточки одним get_many"""
+        with mock.patch.object(
+                cache, 'get_many', wraps=cache.get_many) as get_many:
+            response = self.guest_client.get(reverse('posts:index'))
+        card_reads = [
+            call for call in get_many.call_args_list
+            if any(key.startswith('post-card:') for key in call.args[0])]
+        self.assertEqual(len(card_reads), 1)
+        self.assertEqual(response.content.decode().count('<hr>'), 2)
+
+    def test_cards_not_counted_twice_in_template_time(self):
+        """Время карточек входит во время страницы один раз"""
+        with mock.patch('core.performance.record_template') as record:
+            self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(record.call_count, 1)
+
+    def test_cached_cards_render_same_page(self):
+        """Страница из кэшированных карточек совпадает с нарисованной"""
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        first = self.guest_client.get(url).content
+        bump('author:author')
+        self.assertEqual(self.guest_client.get(url).content, first)
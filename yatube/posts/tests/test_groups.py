@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import authors
+from posts.cache import bump
+from posts.groups import registry
+from posts.models import Group, Post
+from posts.tests.shortcuts import group_create, post_create
+
+User = get_user_model()
+
+
+class GroupRegistryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = group_create('Группа', 'Описание')
+        for i in range(3):
+            post_create(f'Пост {i}', cls.author, cls.group)
+
+    def setUp(self):
+        cache.clear()
+        authors.get_many([self.author.pk])
+        self.guest_client = Client()
+
+    def test_warm_registry_skips_group_query(self):
+        """С прогретым реестром лента группы — один запрос"""
+        url = reverse('posts:group_list', kwargs={'slug': 'slug'})
+        registry.current()
+        with self.assertNumQueries(1):
+            response = self.guest_client.get(url)
+        self.assertEqual(response.context['group'], self.group)
+
+    def test_feed_posts_get_groups_from_registry(self):
+        """Группы постов ленты не дочитываются из базы"""
+        registry.current()
+        with self.assertNumQueries(1):
+            slugs = [post.group.slug for post in Post.objects.feed()]
+        self.assertEqual(slugs, ['slug'] * 3)
+
+    def test_saved_group_refreshes_registry(self):
+        """Сохранение группы сдвигает версию и реестр перечитывается"""
+        registry.current()
+        Group.objects.filter(pk=self.group.pk).update(title='Старое')
+        self.assertEqual(registry.get(self.group.pk).title, 'Группа')
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое'
+        group.save()
+        self.assertEqual(registry.get(self.group.pk).title, 'Новое')
+        self.assertEqual(registry.get_by_slug('slug').title, 'Новое')
+
+    def test_other_worker_bump_is_noticed(self):
+        """Версия в общем кэше — сигнал для остальных воркеров"""
+        registry.current()
+        Group.objects.bulk_create([
+            Group(title='Другая', slug='other', description='')])
+        self.assertIsNone(registry.get_by_slug('other'))
+        bump('groups')
+        self.assertIsNotNone(registry.get_by_slug('other'))
+
+    def test_unknown_slug_is_404(self):
+        response = self.guest_client.get(
+            reverse('posts:group_list', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,103 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow
+from posts.tests.shortcuts import group_create, post_create
+
+User = get_user_model()
+
+# Реестр групп целиком читает маленькую таблицу групп, раз на версию.
+REGISTRY_SCAN = 'SCAN posts_group'
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN есть в SQLite')
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = group_create('Группа', 'Описание')
+        for i in range(12):
+            cls.post = post_create(f'Пост {i}', cls.author, cls.group)
+        for i in range(3):
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text=f'Комментарий {i}')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def view_queries(self, url, params=None):
+        """SQL, который выполняет представление при пустом кэше."""
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries]
+
+    def assertUsesIndexes(self, url, params=None, ordered_scan=False):
+        """Каждый шаг плана каждого запроса — поиск по индексу.
+
+        ordered_scan разрешает проход по индексу в порядке сортировки:
+        так читается общая лента, где LIMIT останавливает просмотр.
+        """
+        for sql in self.view_queries(url, params):
+            plan = self.plan(sql)
+            for step in plan:
+                self.assertNotIn(
+                    'TEMP B-TREE', step, f'Сортировка: {sql}\n{plan}')
+                if step.startswith('SCAN') and step != REGISTRY_SCAN:
+                    self.assertTrue(
+                        ordered_scan and 'USING INDEX' in step,
+                        f'Полный просмотр таблицы: {sql}\n{plan}')
+
+    def next_page(self, url):
+        cache.clear()
+        response = self.client.get(url)
+        return {'after': response.context['page_obj'].paginator.next_cursor}
+
+    def test_feed_queries_use_indexes(self):
+        """Запросы лент читают индексы без сортировки в памяти"""
+        index = reverse('posts:index')
+        self.assertUsesIndexes(index, ordered_scan=True)
+        self.assertUsesIndexes(
+            index, self.next_page(index), ordered_scan=True)
+        feeds = (
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+        )
+        for url in feeds:
+            with self.subTest(url=url):
+                self.assertUsesIndexes(url)
+                self.assertUsesIndexes(url, self.next_page(url))
+
+    def test_follow_queries_use_indexes(self):
+        """Лента подписок и проверка подписки идут по индексам"""
+        url = reverse('posts:follow_index')
+        self.assertUsesIndexes(url)
+        self.assertUsesIndexes(url, self.next_page(url))
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_timeline_merge_uses_indexes(self):
+        """Посты популярных авторов подмешиваются по индексу автора"""
+        self.assertUsesIndexes(reverse('posts:follow_index'))
+
+    def test_comments_query_uses_index(self):
+        """Комментарии поста читаются по индексу (post, created)"""
+        self.assertUsesIndexes(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}))
+        self.assertUsesIndexes(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk}))
@@ -0,0 +1,79 @@
+from importlib.util import find_spec
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow
+from posts.tests.shortcuts import group_create, post_create
+
+User = get_user_model()
+
+
+def text(response):
+    # Движки расставляют пробелы по-разному, сравнивается текст.
+    return ' '.join(response.content.decode().split())
+
+
+def engines(response, template_name):
+    """Пакеты, чьи шаблоны с именем template_name рендерил ответ."""
+    return {
+        type(template).__module__.split('.')[0]
+        for template in response.templates if template.name == template_name}
+
+
+@skipUnless(find_spec('jinja2'), 'jinja2 не установлен')
+class Jinja2FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', first_name='Имя', last_name='Фамилия')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = group_create('Группа', 'Описание')
+        for i in range(3):
+            post_create(f'Пост {i}', cls.author, cls.group)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def render(self, url, views):
+        cache.clear()
+        with override_settings(JINJA2_VIEWS=views):
+            return self.client.get(url)
+
+    def test_feeds_match_django_templates(self):
+        """Ленты на Jinja2 совпадают по разметке с шаблонами Django"""
+        pages = (
+            (reverse('posts:index'), 'posts/index.html'),
+            (reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+             'posts/group_list.html'),
+            (reverse('posts:profile', kwargs={'username': 'author'}),
+             'posts/profile.html'),
+            (reverse('posts:follow_index'), 'posts/follow.html'),
+        )
+        for url, template_name in pages:
+            with self.subTest(url=url):
+                django = self.render(url, set())
+                jinja = self.render(url, {'all'})
+                self.assertEqual(
+                    engines(jinja, template_name), {'jinja2'})
+                self.assertEqual(
+                    engines(django, template_name), {'django'})
+                self.assertEqual(text(jinja), text(django))
+
+    def test_cards_rendered_by_jinja2(self):
+        """Карточки ленты на Jinja2 рисуются без шаблонов Django"""
+        with mock.patch('django.template.Engine.get_template') as django:
+            response = self.render(reverse('posts:index'), {'index'})
+        self.assertContains(response, 'Пост 2')
+        django.assert_not_called()
+
+    def test_context_visible_to_test_client(self):
+        response = self.render(reverse('posts:index'), {'index'})
+        self.assertIn('page_obj', response.context.keys())
+        self.assertEqual(len(response.context['page_obj']), 3)
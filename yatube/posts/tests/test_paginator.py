@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.core.cache import cache
+
+from posts.tests.shortcuts import group_create, post_create
+from posts.utils import encode_cursor
+
+User = get_user_model()
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = group_create('Группа', 'Описание')
+        for i in range(13):
+            post_create(f'Пост {i}', cls.author, cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_cursor_pages_cover_whole_feed(self):
+        """Курсоры ведут по ленте вперёд и назад без пропусков"""
+        url = reverse('posts:group_list', kwargs={'slug': 'slug'})
+        first = self.guest_client.get(url).context['page_obj']
+        self.assertEqual(len(first), 10)
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = self.guest_client.get(
+            url, {'after': first.paginator.next_cursor}
+        ).context['page_obj']
+        self.assertEqual(len(second), 3)
+        self.assertFalse(second.has_next())
+        self.assertEqual(
+            [post.text for post in list(first) + list(second)],
+            [f'Пост {i}' for i in range(12, -1, -1)]
+        )
+
+        back = self.guest_client.get(
+            url, {'before': second.paginator.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(back), list(first))
+
+    def test_cursor_page_skips_count_query(self):
+        """В курсорном режиме не выполняется COUNT(*)"""
+        with CaptureQueriesContext(connection) as queries:
+            self.guest_client.get(reverse('posts:index'))
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries)
+        )
+
+    def test_broken_cursor_shows_first_page(self):
+        """Испорченный курсор открывает первую страницу"""
+        response = self.guest_client.get(
+            reverse('posts:index'), {'after': 'broken'}
+        )
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj[0].text, 'Пост 12')
+        self.assertFalse(page_obj.has_previous())
+
+    def test_crafted_cursor_shows_first_page(self):
+        """Несуществующая дата и огромный id в курсоре не роняют ленты"""
+        post = self.author.posts.first()
+        cursors = (
+            encode_cursor(['2020-13-01T00:00:00', 1]),
+            encode_cursor([post.pub_date, 10 ** 30]),
+            encode_cursor([post.pub_date, True]),
+        )
+        pages = (
+            (reverse('posts:index'), {}),
+            (reverse('api:posts'), {}),
+            (reverse('posts:post_comments', kwargs={'post_id': post.pk}), {}),
+            (reverse('posts:search'), {'q': 'Пост'}),
+        )
+        for url, params in pages:
+            for cursor in cursors:
+                with self.subTest(url=url, cursor=cursor):
+                    response = self.guest_client.get(
+                        url, {**params, 'after': cursor})
+                    self.assertEqual(response.status_code, 200)
+        search = encode_cursor([float('inf'), 10 ** 30])
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'Пост', 'after': search})
+        self.assertEqual(response.status_code, 200)
+
+    def test_page_number_still_supported(self):
+        """Старые ссылки ?page=N продолжают работать"""
+        response = self.guest_client.get(reverse('posts:index'), {'page': 2})
+        self.assertEqual(len(response.context['page_obj']), 3)
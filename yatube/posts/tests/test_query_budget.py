@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import authors
+from posts.groups import registry
+from posts.models import Follow
+from posts.tests.shortcuts import group_create, post_create
+
+User = get_user_model()
+
+
+class FeedQueryBudgetTests(TestCase):
+    """Число запросов ленты не зависит от числа постов на странице."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author', first_name='Имя', last_name='Фамилия')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = group_create('Группа', 'Описание')
+        for i in range(12):
+            post_create(f'Пост {i}', cls.author, cls.group)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        # У работающего воркера реестр групп и карточки авторов прогреты.
+        registry.current()
+        authors.get_many([self.author.pk])
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_guest_feed_query_budget(self):
+        """Ленты для гостя укладываются в бюджет запросов"""
+        budgets = {
+            reverse('posts:index'): 1,
+            reverse('posts:group_list', kwargs={'slug': 'slug'}): 1,
+            reverse('posts:profile', kwargs={'username': 'author'}): 2,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url), self.assertNumQueries(budget):
+                self.guest_client.get(url)
+
+    def test_follow_feed_query_budget(self):
+        """Лента подписок: сессия, пользователь и три запроса ленты"""
+        with self.assertNumQueries(5):
+            self.reader_client.get(reverse('posts:follow_index'))
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post
+from posts.tests.shortcuts import group_create, post_create
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = group_create('Группа', 'Описание')
+        cls.commented = post_create('Про котов', cls.author, cls.group)
+        cls.direct = post_create('Ручная кладь', cls.author, cls.group)
+        Comment.objects.create(
+            post=cls.commented, author=cls.author, text='Кладь не влезла')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def found(self, query, **params):
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': query, **params})
+        return response, list(response.context['page_obj'])
+
+    def test_search_ranks_post_text_above_comments(self):
+        """Поиск находит посты и по комментариям, текст поста важнее"""
+        response, posts = self.found('кладь')
+        self.assertEqual(posts, [self.direct, self.commented])
+
+    def test_index_follows_edits_and_deletes(self):
+        """Правка и удаление поста сразу видны в поиске"""
+        post = Post.objects.get(pk=self.direct.pk)
+        post.text = 'Багаж'
+        post.save()
+        self.assertEqual(self.found('ручная')[1], [])
+        self.assertEqual(self.found('багаж')[1], [post])
+        post.delete()
+        self.assertEqual(self.found('багаж')[1], [])
+
+    def test_results_are_paginated_by_cursor(self):
+        """Результаты листаются курсором, запрос сохраняется в ссылках"""
+        for i in range(12):
+            post_create(f'Отпуск {i}', self.author, None)
+        response, first = self.found('отпуск')
+        self.assertEqual(len(first), 10)
+        cursor = response.context['page_obj'].paginator.next_cursor
+        self.assertContains(
+            response, f'?q=%D0%BE%D1%82%D0%BF%D1%83%D1%81%D0%BA&amp;'
+                      f'after={cursor}')
+        response, second = self.found('отпуск', after=cursor)
+        self.assertEqual(len(second), 2)
+        self.assertFalse(set(first) & set(second))
+
+    def test_empty_query_shows_no_results(self):
+        """Пустой запрос ничего не ищет"""
+        response, posts = self.found('')
+        self.assertEqual(posts, [])
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.test import TestCase
+
+from posts import seeding
+from posts.models import Comment, Follow, Post, Profile, TimelineEntry
+
+User = get_user_model()
+
+
+class SeedingTests(TestCase):
+    def generate(self):
+        return seeding.generate(
+            users=20, groups=3, posts=200, comments=100, follows=5)
+
+    def test_generates_requested_volumes(self):
+        """Создаётся заданное число строк, производные данные собраны"""
+        counts = self.generate()
+        self.assertEqual(counts['post'], Post.objects.count())
+        self.assertEqual(counts['post'], 200)
+        self.assertEqual(Comment.objects.count(), 100)
+        self.assertEqual(counts['follow'], Follow.objects.count())
+        self.assertEqual(Profile.objects.count(), 20)
+        self.assertFalse(Comment.objects.filter(
+            created__lt=F('post__pub_date')).exists())
+        self.assertEqual(
+            TimelineEntry.objects.count(),
+            sum(Post.objects.filter(author=follow.author).count()
+                for follow in Follow.objects.all()))
+
+    def test_is_deterministic(self):
+        """Одно и то же зерно даёт одни и те же данные"""
+        self.generate()
+        first = list(Post.objects.order_by('pk').values_list(
+            'text', 'author__username'))
+        User.objects.all().delete()
+        self.generate()
+        second = list(Post.objects.order_by('pk').values_list(
+            'text', 'author__username'))
+        self.assertEqual(first, second)
+
+    def test_follow_graph_is_skewed(self):
+        """Подписчики сосредоточены у немногих популярных авторов"""
+        self.generate()
+        followers = sorted(
+            Profile.objects.values_list('followers_count', flat=True),
+            reverse=True)
+        self.assertGreater(sum(followers[:4]), sum(followers) / 2)
@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, TimelineEntry
+from posts.tests.shortcuts import group_create, post_create
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = group_create('Группа', 'Описание')
+        for i in range(3):
+            post_create(f'Старый пост {i}', cls.author, cls.group)
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def follow_feed(self):
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        return [post.text for post in response.context['page_obj']]
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Подписка заполняет ленту, отписка очищает её"""
+        self.reader_client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'author'}))
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 3)
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', kwargs={'username': 'author'}))
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.reader).exists())
+        self.assertEqual(self.follow_feed(), [])
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост сразу попадает в ленты подписчиков"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post_create('Новый пост', self.author, self.group)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 4)
+        self.assertEqual(self.follow_feed()[0], 'Новый пост')
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_author_back_under_limit_keeps_posts(self):
+        """Посты, опубликованные при лимите, не пропадают после отписки"""
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=other, author=self.author)
+        post_create('Новый пост', self.author, self.group)
+        self.assertEqual(len(self.follow_feed()), 4)
+        Follow.objects.filter(user=other).delete()
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 4)
+        self.assertEqual(self.follow_feed()[0], 'Новый пост')
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_heavy_author_is_read_on_request(self):
+        """Посты популярных авторов подмешиваются при чтении"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post_create('Новый пост', self.author, self.group)
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.reader).exists())
+        self.assertEqual(
+            self.follow_feed(),
+            ['Новый пост', 'Старый пост 2', 'Старый пост 1', 'Старый пост 0']
+        )
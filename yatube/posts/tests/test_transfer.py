@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from posts import search
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+from posts.tests.shortcuts import group_create, post_create
+
+User = get_user_model()
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = group_create('Группа', 'Описание')
+        cls.post = post_create('Старый пост', cls.author, cls.group)
+        cls.pub_date = timezone.now() - timedelta(days=30)
+        Post.objects.filter(pk=cls.post.pk).update(pub_date=cls.pub_date)
+        post_create('Пост без группы', cls.author, None)
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def export(self, name, *args):
+        path = os.path.join(self.directory, name)
+        call_command('export_posts', path, *args, stderr=StringIO())
+        return path
+
+    def reset(self):
+        User.objects.all().delete()
+        Group.objects.all().delete()
+
+    def test_ndjson_round_trip(self):
+        """Выгрузка NDJSON загружается обратно со связями и датами"""
+        path = self.export('dump.ndjson')
+        self.reset()
+        call_command('import_posts', path, '--batch-size', '1',
+                     stdout=StringIO())
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(Post.objects.count(), 2)
+        post = Post.objects.get(text='Старый пост')
+        self.assertEqual(post.pub_date, self.pub_date)
+        self.assertEqual(post.group.slug, 'slug')
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(post.comments.get().author.username, 'reader')
+        reader = User.objects.get(username='reader')
+        self.assertEqual(reader.profile.following_count, 1)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=reader).count(), 2)
+        if search.backend() is not None:
+            self.assertEqual(search.post_ids('комментарий', 10), [post.pk])
+
+    def test_csv_import_resolves_existing_users(self):
+        """CSV одной модели ссылается на уже загруженных пользователей"""
+        path = self.export('follows.csv', '--format', 'csv',
+                           '--model', 'follow')
+        Follow.objects.all().delete()
+        call_command('import_posts', path, '--format', 'csv',
+                     '--model', 'follow', stdout=StringIO())
+        self.assertTrue(Follow.objects.filter(
+            user=self.reader, author=self.author).exists())
+
+    def test_csv_comments_use_saved_post_map(self):
+        """Комментарии из отдельного CSV находят посты по карте id"""
+        posts = self.export('post.csv', '--format', 'csv', '--model', 'post')
+        comments = self.export('comment.csv', '--format', 'csv',
+                               '--model', 'comment')
+        id_map = os.path.join(self.directory, 'posts.map')
+        Post.objects.all().delete()
+        call_command('import_posts', posts, '--format', 'csv',
+                     '--model', 'post', '--id-map', id_map,
+                     stdout=StringIO())
+        call_command('import_posts', comments, '--format', 'csv',
+                     '--model', 'comment', '--id-map', id_map,
+                     stdout=StringIO())
+        post = Post.objects.get(text='Старый пост')
+        self.assertEqual(post.comments.get().text, 'Комментарий')
+        self.assertEqual(post.comments_count, 1)
+
+    def test_csv_comments_require_post_map(self):
+        """Без карты id загрузка комментариев из CSV отклоняется"""
+        path = self.export('comment.csv', '--format', 'csv',
+                           '--model', 'comment')
+        with self.assertRaises(CommandError):
+            call_command('import_posts', path, '--format', 'csv',
+                         '--model', 'comment', stdout=StringIO())
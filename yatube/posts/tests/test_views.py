@@ -2,7 +2,7 @@ import tempfile
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.test import TestCase, Client, override_settings
-from posts.models import Post, User, Follow
+from posts.models import Post, User, Follow, Group
 from django.urls import reverse
 from django.core.cache import cache
 from posts.tests.shortcuts import group_create, post_create
@@ -107,20 +107,47 @@ class PostPagesTests(TestCase):
                 self.assertEqual(post_author, self.user_author)
 
     def test_cache_index(self):
-        """Проверка хранения и очищения кэша для index."""
+        """Главная отдаётся из кэша, пока посты не изменились."""
         response = self.author_client.get(reverse('posts:index'))
-        posts = response.content
+        cached = self.author_client.get(reverse('posts:index'))
+        self.assertIsNone(cached.context)
+        self.assertEqual(cached.content, response.content)
         Post.objects.create(
             text='Пост 1',
             author=self.user_author,
         )
-        response_old = self.author_client.get(reverse('posts:index'))
-        old_posts = response_old.content
-        self.assertEqual(old_posts, posts)
-        cache.clear()
         response_new = self.author_client.get(reverse('posts:index'))
-        new_posts = response_new.content
-        self.assertNotEqual(old_posts, new_posts)
+        self.assertIsNotNone(response_new.context)
+        self.assertNotEqual(response_new.content, response.content)
+
+    def test_cache_pages_invalidated_by_comment(self):
+        """Комментарий сбрасывает кэш страницы поста."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        self.guest_client.get(url)
+        self.assertIsNone(self.guest_client.get(url).context)
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.id}),
+            {'text': 'Новый комментарий'}
+        )
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Новый комментарий')
+
+    def test_cache_pages_invalidated_by_rename(self):
+        """Смена slug и имени сбрасывает страницы со старыми ссылками."""
+        detail = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        profile = reverse('posts:profile', kwargs={'username': 'StasBasov'})
+        old_link = reverse('posts:group_list', kwargs={'slug': 'slug'})
+        self.assertContains(self.guest_client.get(detail), old_link)
+        self.assertContains(self.guest_client.get(profile), old_link)
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'new-slug'
+        group.save()
+        self.assertNotContains(self.guest_client.get(detail), old_link)
+        self.assertNotContains(self.guest_client.get(profile), old_link)
+        author = User.objects.get(pk=self.user_author.pk)
+        author.username = 'NewName'
+        author.save()
+        self.assertEqual(self.guest_client.get(profile).status_code, 404)
 
     def test_follow_on_authors(self):
         """Проверка, что авторизованный пользователь
@@ -0,0 +1,65 @@
+"""Миниатюры картинок постов, построенные заранее в фоновом потоке.
+
+Адрес и размеры миниатюры хранятся в строке поста, поэтому шаблоны
+выводят картинку без обращения к хранилищу sorl-thumbnail и без работы
+PIL во время запроса. Пока миниатюра не готова, показывается оригинал.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from sorl.thumbnail import get_thumbnail
+
+from .cache import invalidate, post_scopes
+from .models import Post
+
+GEOMETRY = '960x339'
+OPTIONS = {'crop': 'center', 'upscale': True}
+
+logger = logging.getLogger(__name__)
+executor = ThreadPoolExecutor(
+    max_workers=settings.THUMBNAIL_WORKERS,
+    thread_name_prefix='thumbnails',
+)
+
+
+def build(post_id, image_name):
+    """Строит миниатюру и сохраняет её адрес в посте."""
+    try:
+        post = Post.objects.only('image').get(pk=post_id)
+        if post.image.name != image_name:
+            return
+        thumbnail = get_thumbnail(post.image, GEOMETRY, **OPTIONS)
+        Post.objects.filter(pk=post_id, image=image_name).update(
+            thumbnail_url=thumbnail.url,
+            thumbnail_width=thumbnail.width,
+            thumbnail_height=thumbnail.height,
+        )
+        invalidate(*post_scopes(post_id))
+    except Exception:
+        logger.exception('Не удалось построить миниатюру поста %s', post_id)
+
+
+def _build_in_thread(post_id, image_name):
+    try:
+        build(post_id, image_name)
+    finally:
+        connection.close()
+
+
+def schedule(post):
+    """Сбрасывает старую миниатюру и ставит построение новой в очередь.
+
+    Задача уходит в пул после фиксации транзакции, чтобы поток увидел
+    сохранённый файл и строку поста.
+    """
+    Post.objects.filter(pk=post.pk).update(
+        thumbnail_url='', thumbnail_width=None, thumbnail_height=None)
+    if not post.image:
+        return
+    if settings.THUMBNAIL_ASYNC:
+        transaction.on_commit(lambda: executor.submit(
+            _build_in_thread, post.pk, post.image.name))
+    else:
+        build(post.pk, post.image.name)
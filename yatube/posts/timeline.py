@@ -0,0 +1,151 @@
+"""Лента подписок, собранная заранее (fan-out on write).
+
+Новый пост раскладывается по лентам подписчиков автора, поэтому
+follow_index читает один диапазон индекса TimelineEntry вместо
+соединения Follow и Post. Посты авторов, у которых подписчиков больше
+TIMELINE_FANOUT_LIMIT, не раскладываются: они подмешиваются в ленту
+при чтении (fan-out on read).
+"""
+from django.conf import settings
+from django.db import connection
+
+from .models import Follow, Post, Profile, TimelineEntry
+from .utils import CursorPaginator
+
+
+def is_heavy(author_id):
+    """Слишком много подписчиков, чтобы раскладывать посты автора."""
+    return Profile.objects.filter(
+        user_id=author_id,
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+    ).exists()
+
+
+def heavy_authors(user):
+    """Авторы из подписок user, чьи посты читаются напрямую."""
+    return list(
+        Follow.objects.filter(
+            user=user,
+            author__profile__followers_count__gt=(
+                settings.TIMELINE_FANOUT_LIMIT)
+        ).values_list('author_id', flat=True)
+    )
+
+
+def fan_out(post):
+    """Добавляет новый пост в ленты подписчиков автора."""
+    if is_heavy(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        TimelineEntry(user_id=user_id, post=post,
+                      author_id=post.author_id, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    )
+
+
+def backfill(follow):
+    """Заполняет ленту подписчика постами нового автора."""
+    if is_heavy(follow.author_id):
+        return
+    posts = Post.objects.filter(
+        author_id=follow.author_id).values_list('id', 'pub_date')
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user_id=follow.user_id, post_id=post_id,
+                       author_id=follow.author_id, pub_date=pub_date)
+         for post_id, pub_date in posts.iterator()),
+        ignore_conflicts=True,
+    )
+
+
+def _insert(where, params):
+    """INSERT ... SELECT строк ленты для подписок, подходящих под where."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR IGNORE INTO {TimelineEntry._meta.db_table} '
+            f'(user_id, post_id, author_id, pub_date) '
+            f'SELECT f.user_id, p.id, p.author_id, p.pub_date '
+            f'FROM {Follow._meta.db_table} f '
+            f'JOIN {Post._meta.db_table} p ON p.author_id = f.author_id '
+            f'WHERE {where}',
+            params,
+        )
+
+
+def rebuild():
+    """Собирает все ленты заново одним INSERT ... SELECT.
+
+    Нужна после массовой загрузки, когда сигналы не срабатывали.
+    """
+    TimelineEntry.objects.all().delete()
+    _insert(
+        f'f.author_id IN (SELECT user_id FROM {Profile._meta.db_table} '
+        f'WHERE followers_count <= %s)',
+        [settings.TIMELINE_FANOUT_LIMIT],
+    )
+
+
+def catch_up(author_id):
+    """Раскладывает посты автора, который снова стал «лёгким».
+
+    Пока подписчиков было больше лимита, его новые посты и подписки
+    на него в ленты не попадали: их читали напрямую. Теперь ленты
+    подписчиков дополняются всеми его постами.
+    """
+    _insert('f.author_id = %s', [author_id])
+
+
+def prune(follow):
+    """Убирает из ленты посты автора после отписки.
+
+    Если из-за отписки автор опустился до лимита, ленты остальных
+    подписчиков дополняются его постами (см. catch_up).
+    """
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id, author_id=follow.author_id).delete()
+    # Счётчик уже уменьшен обработчиком count_deleted_follow.
+    crossed = Profile.objects.filter(
+        user_id=follow.author_id,
+        followers_count=settings.TIMELINE_FANOUT_LIMIT,
+    ).exists()
+    if crossed:
+        catch_up(follow.author_id)
+
+
+class TimelinePaginator(CursorPaginator):
+    """Курсорный вывод ленты подписок пользователя.
+
+    Страница берётся из TimelineEntry и сливается с постами
+    «тяжёлых» авторов, прочитанными по тому же ключу (pub_date, id).
+    """
+    numbered = False
+
+    def __init__(self, user, per_page):
+        super().__init__(
+            TimelineEntry.objects.filter(user=user), per_page,
+            id_field='post_id'
+        )
+        self.heavy_authors = heavy_authors(user)
+
+    def key(self, obj):
+        return obj.pub_date, obj.id
+
+    def fetch(self, key, reverse, limit):
+        entries = super().fetch(key, reverse, limit)
+        # Порядок задаёт сортировка ниже, ORDER BY базе не нужен.
+        posts = {
+            post.id: post for post in Post.objects.feed().filter(
+                id__in=[entry.post_id for entry in entries]
+            ).order_by()
+        }
+        if self.heavy_authors:
+            direct = CursorPaginator(
+                Post.objects.feed().filter(
+                    author_id__in=self.heavy_authors),
+                limit
+            )
+            for post in direct.fetch(key, reverse, limit):
+                posts[post.id] = post
+        return sorted(posts.values(), key=self.key, reverse=not reverse)[
+            :limit]
@@ -1,10 +1,145 @@
-from django.core.paginator import Paginator
+import base64
+import json
 
-SELECT_LIMIT = 10
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 
 
-def paginator(request, posts):
-    paginator = Paginator(posts, SELECT_LIMIT)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    return page_obj
+def encode_cursor(values):
+    """Упаковывает ключ позиции в непрозрачную строку для URL.
+
+    Даты сохраняются с микросекундами: DjangoJSONEncoder их обрезает,
+    и курсор перестал бы совпадать с записью в базе.
+    """
+    raw = json.dumps(values, default=lambda value: value.isoformat(),
+                     separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Распаковывает курсор. Для испорченного значения вернёт None."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw.decode())
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def valid_id(value):
+    """id из курсора: целое, которое поместится в INTEGER SQLite."""
+    return (isinstance(value, int) and not isinstance(value, bool)
+            and 0 < value < 2 ** 63)
+
+
+class CursorPaginator(Paginator):
+    """Постраничный вывод по ключу (дата, id) без COUNT(*) и OFFSET.
+
+    Следующая страница выбирается условием по ключу последней показанной
+    записи, поэтому время запроса не зависит от глубины листания.
+    Экземпляр хранит курсоры одной страницы: на каждый запрос — свой.
+    """
+    numbered = True
+
+    def __init__(self, object_list, per_page,
+                 date_field='pub_date', id_field='id'):
+        self.date_field = date_field
+        self.id_field = id_field
+        if hasattr(object_list, 'order_by'):
+            object_list = object_list.order_by(
+                f'-{date_field}', f'-{id_field}')
+        super().__init__(object_list, per_page)
+        self.cursor_mode = False
+        self.extra_query = ''
+        self.next_cursor = None
+        self.previous_cursor = None
+
+    @property
+    def num_pages(self):
+        if self.cursor_mode:
+            return self._num_pages
+        return super().num_pages
+
+    def key(self, obj):
+        return (getattr(obj, self.date_field), getattr(obj, self.id_field))
+
+    def parse_key(self, values):
+        """Проверяет ключ, пришедший из курсора."""
+        if len(values) != 2:
+            return None
+        try:
+            date = parse_datetime(str(values[0]))
+        except ValueError:
+            # Похоже на дату, но такой даты нет: 2020-13-01.
+            return None
+        if date is None or not valid_id(values[1]):
+            return None
+        return date, values[1]
+
+    def fetch(self, key, reverse, limit):
+        """Возвращает до limit записей за ключом key.
+
+        При reverse=False — более старые записи от новых к старым,
+        при reverse=True — более новые в обратном порядке.
+        """
+        queryset = self.object_list
+        date_field, id_field = self.date_field, self.id_field
+        if key is not None:
+            date, pk = key
+            lookup = 'gte' if reverse else 'lte'
+            strict = 'gt' if reverse else 'lt'
+            queryset = queryset.filter(**{f'{date_field}__{lookup}': date})
+            queryset = queryset.filter(
+                Q(**{f'{date_field}__{strict}': date})
+                | Q(**{f'{id_field}__{strict}': pk})
+            )
+        if reverse:
+            queryset = queryset.order_by(date_field, id_field)
+        return list(queryset[:limit])
+
+    def cursor_page(self, after=None, before=None):
+        """Страница после курсора after либо перед курсором before."""
+        reverse = not after and bool(before)
+        key = None
+        values = decode_cursor(before if reverse else after or '')
+        if values is not None:
+            key = self.parse_key(values)
+        if key is None:
+            reverse = False
+        items = self.fetch(key, reverse, self.per_page + 1)
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if reverse:
+            if not items:
+                return self.cursor_page()
+            items.reverse()
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = key is not None, has_more
+        self.cursor_mode = True
+        if items:
+            if has_next:
+                self.next_cursor = encode_cursor(self.key(items[-1]))
+            if has_previous:
+                self.previous_cursor = encode_cursor(self.key(items[0]))
+        number = 2 if has_previous else 1
+        self._num_pages = number + 1 if has_next else number
+        return Page(items, number, self)
+
+
+def paginator(request, posts, paginator_class=CursorPaginator):
+    """Единая точка постраничного вывода лент.
+
+    posts передаётся в конструктор paginator_class. Ленты листаются
+    курсором (?after= / ?before=), старые ссылки вида ?page=N
+    по-прежнему обслуживаются обычной нумерацией.
+    """
+    pages = paginator_class(posts, settings.POSTS_MAX)
+    if pages.numbered and 'page' in request.GET:
+        return pages.get_page(request.GET['page'])
+    return pages.cursor_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
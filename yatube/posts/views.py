@@ -1,67 +1,89 @@
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.paginator import Paginator
-from .models import Post, Group, User, Follow
+from .models import Post, User, Follow
 from django.contrib.auth.decorators import login_required
+from . import thumbnails
+from core.db.routers import use_replica
+from .authors import get_author_or_404
+from .cache import cache_response, depends_on
+from .comments import comments_page, first_comments, render_comments
 from .forms import PostForm, CommentForm
-from django.conf import settings
+from .groups import get_group_or_404
+from .search import SearchPaginator
+from .timeline import TimelinePaginator
+from .utils import paginator
+
 
+def render_feed(request, view_name, template_name, context):
+    """render() движком, выбранным для представления в JINJA2_VIEWS."""
+    views = settings.JINJA2_VIEWS
+    using = 'jinja2' if 'all' in views or view_name in views else None
+    return render(request, template_name, context, using=using)
 
+
+@use_replica
+@cache_response
 def index(request):
-    post_list = Post.objects.all().select_related('author').order_by(
-        '-pub_date')
-    paginator = Paginator(post_list, settings.POSTS_MAX)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    depends_on(request, 'posts')
+    page_obj = paginator(request, Post.objects.feed())
     context = {
         'page_obj': page_obj,
     }
-    return render(request, 'posts/index.html', context)
+    return render_feed(request, 'index', 'posts/index.html', context)
 
 
+@use_replica
+@cache_response
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group).order_by('author')
-    paginator = Paginator(posts, settings.POSTS_MAX)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    depends_on(request, f'group:{slug}')
+    group = get_group_or_404(slug)
+    posts = Post.objects.feed().filter(group=group)
+    page_obj = paginator(request, posts)
     context = {
         'group': group,
         'posts': posts,
         'page_obj': page_obj,
     }
-    return render(request, 'posts/group_list.html', context)
+    return render_feed(
+        request, 'group_list', 'posts/group_list.html', context)
 
 
+@use_replica
+@cache_response
 def profile(request, username):
+    depends_on(request, f'author:{username}')
     following = False
-    author = get_object_or_404(User, username=username)
+    author = get_author_or_404(username)
     following = (
         request.user.is_authenticated and Follow.objects.filter(
             user=request.user, author=author).exists()
     )
-    user_posts = author.posts.select_related('author').order_by('-pub_date')
-    paginator = Paginator(user_posts, settings.POSTS_MAX)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    user_posts = author.posts.feed()
+    page_obj = paginator(request, user_posts)
     context = {
         'author': author,
         'user_posts': user_posts,
         'page_obj': page_obj,
         'following': following,
     }
-    return render(request, 'posts/profile.html', context)
+    return render_feed(request, 'profile', 'posts/profile.html', context)
 
 
+@use_replica
+@cache_response
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    author_posts = (Post.objects.select_related('author')
-                    .filter(author=post.author))
-    author_posts_count = author_posts.count()
+    depends_on(request, f'post:{post_id}')
+    post = get_object_or_404(Post.objects.with_cards(), id=post_id)
+    depends_on(request, f'author:{post.author.username}')
+    if post.group:
+        depends_on(request, f'group:{post.group.slug}')
+    author_posts_count = post.author.profile.posts_count
     form = CommentForm()
-    comments = post.comments.all()
+    comments = first_comments(post.pk)
     context = {
         'post': post,
-        'author_posts': author_posts,
         'author_posts_count': author_posts_count,
         'form': form,
         'comments': comments
@@ -69,14 +91,51 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+@cache_response
+def search(request):
+    depends_on(request, 'posts')
+    query = request.GET.get('q', '').strip()
+    page_obj = paginator(request, query, paginator_class=SearchPaginator)
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
+def post_comments(request, post_id):
+    """Старые комментарии: JSON, фрагмент для HTMX или отдельная страница."""
+    get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    after = request.GET.get('after')
+    if (request.GET.get('format') == 'json'
+            or 'application/json' in request.META.get('HTTP_ACCEPT', '')):
+        page_obj = comments_page(post_id, after)
+        return JsonResponse({
+            'comments': [{
+                'id': comment.pk,
+                'author': comment.author.username,
+                'text': comment.text,
+                'created': comment.created.isoformat(),
+            } for comment in page_obj],
+            'next': page_obj.paginator.next_cursor,
+        })
+    comments = render_comments(post_id, after)
+    if request.META.get('HTTP_HX_REQUEST'):
+        return HttpResponse(comments)
+    context = {'comments': comments, 'post_id': post_id}
+    return render(request, 'posts/comments.html', context)
+
+
 @login_required
+@transaction.atomic
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if request.method == 'POST':
         if form.is_valid():
             post = form.save(commit=False)
             post.author = request.user
             post.save()
+            thumbnails.schedule(post)
             return redirect('posts:profile', post.author)
         return render(request, 'posts/create_post.html', {'form': form})
     return render(request, 'posts/create_post.html', {'form': form})
@@ -95,7 +154,9 @@ def post_edit(request, post_id):
     )
     if request.method == 'POST':
         if form.is_valid():
-            form.save()
+            post = form.save()
+            if 'image' in form.changed_data:
+                thumbnails.schedule(post)
             return redirect('posts:post_detail', post_id)
     context = {
         'form': form,
@@ -106,6 +167,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -119,15 +181,14 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    following = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(following, settings.POSTS_MAX)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginator(
+        request, request.user, paginator_class=TimelinePaginator)
     context = {'page_obj': page_obj}
-    return render(request, 'posts/follow.html', context)
+    return render_feed(request, 'follow_index', 'posts/follow.html', context)
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     following_author = get_object_or_404(User, username=username)
     if request.user != following_author:
@@ -137,6 +198,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     following_author = get_object_or_404(User, username=username)
     Follow.objects.filter(user=request.user, author=following_author).delete()
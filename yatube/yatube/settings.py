@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import sys
+from importlib.util import find_spec
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -46,10 +48,14 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'about',
+    'api.apps.ApiConfig',
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
+    'core.querylog.QueryLogMiddleware',
+    'core.db.routers.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -61,12 +67,26 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yatube.urls'
 
+# Боевой режим шаблонов: включения встраиваются при компиляции,
+# скомпилированные шаблоны кэшируются в процессе. Правки шаблонов
+# тогда видны только после перезапуска, поэтому при DEBUG он выключен.
+TEMPLATE_CACHE = os.environ.get(
+    'TEMPLATE_CACHE', '' if DEBUG else '1') == '1'
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if TEMPLATE_CACHE:
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', [
+        ('core.template.loaders.Loader', TEMPLATE_LOADERS),
+    ])]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template.backends.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -78,19 +98,54 @@ TEMPLATES = [
     },
 ]
 
+# Ленты на Jinja2 (необязательная зависимость): JINJA2_VIEWS=index,profile
+# или all. Шаблоны Django остаются первыми и находятся по умолчанию.
+JINJA2_VIEWS = set(
+    filter(None, os.environ.get('JINJA2_VIEWS', '').split(',')))
+if find_spec('jinja2') is not None:
+    TEMPLATES.append({
+        'BACKEND': 'core.template.jinja2.Jinja2',
+        'DIRS': [os.path.join(BASE_DIR, 'templates_jinja2')],
+        'OPTIONS': {
+            'environment': 'core.template.jinja2.environment',
+            'context_processors': (
+                TEMPLATES[0]['OPTIONS']['context_processors']),
+        },
+    })
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# core.db.backends.sqlite3 включает WAL и PRAGMA для конкурентной работы;
+# соединения переиспользуются между запросами в течение CONN_MAX_AGE.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Реплики только для чтения: SQLITE_REPLICAS=/path/r1.sqlite3,/path/r2.sqlite3.
+# Локально их наполняет manage.py replicate.
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+        filter(None, os.environ.get('SQLITE_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+
+# Столько секунд после записи пользователь читает из основной базы.
+REPLICA_PIN_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -132,6 +187,17 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+# Боевой режим статики: collectstatic собирает в STATIC_ROOT файлы
+# с хэшем содержимого в имени и их копии .gz и .br (с пакетом brotli).
+# Без собранного манифеста {% static %} падает, поэтому при DEBUG
+# режим выключен. Отдаёт файлы core.staticfiles.wsgi.StaticFiles.
+STATIC_ROOT = os.path.join(BASE_DIR, 'static_root')
+STATIC_MANIFEST = os.environ.get(
+    'STATIC_MANIFEST', '' if DEBUG else '1') == '1'
+if STATIC_MANIFEST:
+    STATICFILES_STORAGE = (
+        'core.staticfiles.storage.CompressedManifestStaticFilesStorage')
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
@@ -150,10 +216,72 @@ ALLOWED_HOSTS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+# Статика с хэшем в имени кэшируется навсегда, остальная статика
+# и медиа — на столько секунд.
+FILES_MAX_AGE = 60 * 60
+
+# Кэш общий для всех воркеров. Без внешних сервисов он хранится в файле
+# SQLite, Redis или Memcached подключаются переменной окружения CACHE_URL:
+# redis://host:6379/0, memcached://host:11211 или locmem://. Блокировка
+# от «набега» в core.cache требует атомарного cache.add, поэтому
+# FileBasedCache не подходит. Тесты работают со своим кэшем в памяти.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+CACHE_URL = os.environ.get('CACHE_URL', '')
+
+if CACHE_URL.startswith('redis://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+elif CACHE_URL.startswith('memcached://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': CACHE_URL[len('memcached://'):],
+        }
+    }
+elif CACHE_URL.startswith('locmem://') or TESTING:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache_backends.sqlite.SQLiteCache',
+            'LOCATION': os.path.join(BASE_DIR, 'cache', 'default.sqlite3'),
+            'OPTIONS': {'MAX_ENTRIES': 100000},
+        }
     }
-}
 
 POSTS_MAX = 10
+COMMENTS_MAX = 20
+
+# Страницы лент сбрасываются при записи, таймаут лишь страхует кэш.
+VIEW_CACHE_TIMEOUT = 60 * 60
+
+# Посты авторов с большим числом подписчиков не раскладываются
+# по лентам при публикации, а подмешиваются при чтении.
+TIMELINE_FANOUT_LIMIT = 10000
+
+# Миниатюры картинок строятся в фоновом пуле потоков после сохранения поста.
+# В тестах — сразу: поток не пишет во временный MEDIA_ROOT после теста.
+THUMBNAIL_ASYNC = not TESTING
+THUMBNAIL_WORKERS = 2
+
+# Запросы дольше порога пишутся в журнал yatube.performance с уровнем
+# WARNING, остальные — с INFO. /metrics закрывается токеном METRICS_TOKEN,
+# без токена он открыт только при DEBUG.
+PERFORMANCE_SLOW_REQUEST_MS = 500
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Выборочная проверка SQL: доля запросов, порог повторов одного
+# отпечатка и порог медленного запроса. Отчёт читает manage.py perf_report.
+QUERY_LOG_SAMPLE_RATE = float(os.environ.get('QUERY_LOG_SAMPLE_RATE', 0.05))
+QUERY_LOG_DUPLICATES = 3
+QUERY_LOG_SLOW_MS = 100
+QUERY_LOG_FILE = os.path.join(BASE_DIR, 'logs', 'queries.jsonl')
+QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
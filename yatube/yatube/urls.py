@@ -18,20 +18,26 @@ from django.contrib import admin
 from django.urls import include, path
 from django.conf.urls.static import static
 
+from core.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('', include('posts.urls', namespace="posts")),
-    path('about/', include('about.urls', namespace='about'))
+    path('about/', include('about.urls', namespace='about')),
+    path('api/', include('api.urls', namespace='api')),
+    path('metrics', metrics, name='metrics'),
 ]
 
 handler403 = 'core.views.csrf_failure'
 handler404 = 'core.views.page_not_found'
 
-urlpatterns += static(
-    settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-)
+# Без DEBUG медиа отдаёт core.staticfiles.wsgi.StaticFiles из yatube.wsgi.
+if settings.DEBUG:
+    urlpatterns += static(
+        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
+    )
 
 # if settings.DEBUG:
 #     import debug_toolbar
@@ -11,6 +11,11 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from core.staticfiles.wsgi import StaticFiles
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# Статика и медиа отдаются до Django, см. core.staticfiles.wsgi.
+application = StaticFiles(application)